@@ -0,0 +1,192 @@
+## python3 -m bench_review                          (10k, 100k and 1M rows)
+## python3 -m bench_review --sizes 10000 --lazy
+## python3 -m bench_review --json bench_output.json
+##
+## Scripted latency benchmark for the review tools. Synthetic CSVs are built by
+## resampling the processed Whitby output, so row widths and value
+## distributions match real files. touchup is driven through
+## TouchUp.parse_command. include_tool is driven through process_rows with
+## input() scripted. Output goes to a null terminal so screen rendering is
+## timed but not shown. Peak memory is measured in a separate tracemalloc pass
+## so its overhead does not distort the latencies.
+
+import argparse
+import builtins
+import contextlib
+import glob
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+SOURCE_FILE = "data/whitby_processed_20250611_232049.csv"
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+WORK_DIR = os.path.join(tempfile.gettempdir(), "nrqs_bench")
+MEMORY_ITERATIONS = 20
+
+class NullTerminal(io.TextIOBase):
+    # Swallows output but reports a tty, so the diff-redraw path is exercised
+    def write(self, text):
+        return len(text)
+
+    def isatty(self):
+        return True
+
+class StopScript(Exception):
+    pass
+
+def make_synthetic_csv(rows, source=SOURCE_FILE, work_dir=WORK_DIR, seed=0):
+    """Write (once) and return a CSV of `rows` rows resampled from source."""
+    os.makedirs(work_dir, exist_ok=True)
+    path = os.path.join(work_dir, f"synthetic_{rows}.csv")
+    if not os.path.exists(path):
+        base = pd.read_csv(source)
+        rng = np.random.default_rng(seed)
+        df = base.iloc[rng.integers(0, len(base), rows)].reset_index(drop=True)
+        df['record_id'] = [f"SYN {i}" for i in range(rows)]
+        df.to_csv(path, index=False)
+    return path
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+def summarise(samples):
+    return {
+        'n': len(samples),
+        'p50_ms': percentile(samples, 50) * 1e3,
+        'p99_ms': percentile(samples, 99) * 1e3,
+        'max_ms': max(samples) * 1e3,
+    }
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def cleanup_saves(path):
+    base, ext = os.path.splitext(path)
+    for leftover in glob.glob(f"{base}_*{ext}") + glob.glob(f"{base}.patch.json"):
+        os.remove(leftover)
+
+def bench_touchup(path, iterations, lazy=False):
+    from touchup import TouchUp
+
+    timings = {}
+    with contextlib.redirect_stdout(NullTerminal()):
+        start = time.perf_counter()
+        app = TouchUp(path, lazy=lazy)
+        timings['load'] = [time.perf_counter() - start]
+        app.display_row()
+        # First find includes the background index build for the column
+        timings['find (first)'] = [timed(lambda: app.parse_command("f occupation labourer"))]
+        commands = {
+            'next': lambda i: "n",
+            'edit': lambda i: f"e occupation bench worker {i}",
+            'undo': lambda i: "undo",
+            'find': lambda i: "f residence Whitby",
+            'find next': lambda i: "fn",
+        }
+        for name, command in commands.items():
+            timings[name] = [timed(lambda: app.parse_command(command(i))) for i in range(iterations)]
+        timings['save'] = []
+        for i in range(3):
+            app.parse_command(f"e occupation bench save {i}")
+            timings['save'].append(timed(lambda: app.parse_command("s")))
+    cleanup_saves(path)
+    return timings
+
+def bench_include_tool(path, iterations, lazy=False):
+    import include_tool
+
+    # Decisions are journalled and periodically compacted into the file, so work on a copy
+    work_path = path.replace('.csv', '_review.csv')
+    shutil.copy(path, work_path)
+    script = iter((['y', 'n', 'skip', 'undo'] * iterations)[:iterations])
+    samples = {}
+    state = {'command': None, 'since': None}
+
+    def scripted_input(prompt=''):
+        if 'Choice' not in prompt:
+            return ''  # "Press Enter to continue" pauses
+        now = time.perf_counter()
+        if state['command'] is not None:
+            samples.setdefault(state['command'], []).append(now - state['since'])
+        try:
+            state['command'] = next(script)
+        except StopIteration:
+            raise StopScript()
+        state['since'] = time.perf_counter()
+        return state['command']
+
+    real_input = builtins.input
+    builtins.input = scripted_input
+    try:
+        with contextlib.redirect_stdout(NullTerminal()):
+            start = time.perf_counter()
+            df = include_tool.load_csv(work_path, lazy=lazy)
+            journal = include_tool.DecisionJournal(work_path)
+            samples['load'] = [time.perf_counter() - start]
+            try:
+                include_tool.process_rows(df, work_path, journal=journal)
+            except StopScript:
+                pass
+    finally:
+        builtins.input = real_input
+        for leftover in (work_path, work_path + '.journal', work_path + '.rowidx.npy', work_path + '.pending.npy'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    return samples
+
+def peak_memory_mb(bench, path, lazy):
+    tracemalloc.start()
+    try:
+        bench(path, MEMORY_ITERATIONS, lazy=lazy)
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+def run(sizes, iterations, lazy=False, memory=True):
+    results = []
+    for rows in sizes:
+        path = make_synthetic_csv(rows)
+        for tool, bench in (('touchup', bench_touchup), ('include_tool', bench_include_tool)):
+            timings = bench(path, iterations, lazy=lazy)
+            results.append({
+                'tool': tool,
+                'rows': rows,
+                'lazy': lazy,
+                'commands': {name: summarise(samples) for name, samples in timings.items()},
+                'peak_mb': peak_memory_mb(bench, path, lazy) if memory else None,
+            })
+            print_result(results[-1])
+    return results
+
+def print_result(result):
+    peak = f"{result['peak_mb']:.1f} MB" if result['peak_mb'] is not None else "not measured"
+    print(f"\n{result['tool']} @ {result['rows']:,} rows{' (lazy)' if result['lazy'] else ''} - peak {peak}")
+    print(f"  {'command':<14}{'n':>6}{'p50 ms':>12}{'p99 ms':>12}{'max ms':>12}")
+    for name, stats in result['commands'].items():
+        print(f"  {name:<14}{stats['n']:>6}{stats['p50_ms']:>12.3f}{stats['p99_ms']:>12.3f}{stats['max_ms']:>12.3f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark command latency of touchup and include_tool.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Row counts to test.")
+    parser.add_argument('--iterations', type=int, default=200, help="Repetitions per command.")
+    parser.add_argument('--lazy', action='store_true', help="Use the lazy paged backend in both tools.")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc pass.")
+    parser.add_argument('--json', help="Also write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.iterations, lazy=args.lazy, memory=not args.no_memory)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
+
+if __name__ == "__main__":
+    main()
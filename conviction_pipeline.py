@@ -0,0 +1,89 @@
+## python3 -m conviction_pipeline    (builds models/conviction_pipeline)
+
+import hashlib
+import json
+import os
+import spacy
+
+BASE_MODEL = "en_core_web_sm"
+PIPELINE_DIR = "models/conviction_pipeline"
+PIPELINE_VERSION_KEY = "conviction_pipeline_version"
+
+def load_data(file_path):
+    with open(file_path, 'r') as file:
+        # Strip newline characters and empty lines
+        data = [line.strip() for line in file if line.strip()]
+    return tuple(data)  # Using tuple to make it immutable (const-like)
+
+ADDITIONAL_PERSON_NAMES= load_data("data/person_names.txt")
+
+ADDITIONAL_PLACE_NAMES = [
+    #"Aislaby",
+    "Barnby",
+    #"Briggswath",
+    #"Danby",
+    #"Danby End",
+    "Eskdaleside",
+    "Glaisdale",
+    "Hartlepool",
+    "Hawsker cum Stainsacre",
+    #"Hutton Mulgrave",
+    #"Kirby Moorside",
+    #"Levisham",
+    "Liverton Mines",
+    "Lythe",
+    #"Mickleby",
+    "Newholm cum Dunsley",
+    #"Old Malton",
+    #"Rosedale",
+    #"Robin Hood's Bay",
+    "Roxby",
+    #"Ugglebarnby",
+   #"Victoria Road"
+]
+
+def gazetteer_patterns():
+    # People are listed last so a person name wins over a place name of the same length
+    return (
+        [{"label": "LOC", "pattern": name} for name in ADDITIONAL_PLACE_NAMES] +
+        [{"label": "PERSON", "pattern": name} for name in ADDITIONAL_PERSON_NAMES]
+    )
+
+def pipeline_version(base_model=BASE_MODEL):
+    # Changes whenever spaCy, the base model or the gazetteers change
+    fingerprint = json.dumps({
+        "spacy": spacy.__version__,
+        "base_model": base_model,
+        "base_model_version": spacy.util.get_package_version(base_model),
+        "patterns": gazetteer_patterns(),
+    }, sort_keys=True)
+    return hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()[:12]
+
+def build_pipeline(base_model=BASE_MODEL):
+    nlp = spacy.load(base_model)
+    # Runs after the statistical NER and replaces any entity it overlaps
+    ruler = nlp.add_pipe("entity_ruler", last=True, config={"overwrite_ents": True})
+    ruler.add_patterns(gazetteer_patterns())
+    nlp.meta[PIPELINE_VERSION_KEY] = pipeline_version(base_model)
+    return nlp
+
+def saved_pipeline_version(path=PIPELINE_DIR):
+    meta_path = os.path.join(path, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, 'r') as f:
+        return json.load(f).get(PIPELINE_VERSION_KEY)
+
+def load_pipeline(path=PIPELINE_DIR):
+    # Load the saved snapshot, or build in-process if it is missing or stale
+    version = pipeline_version()
+    if saved_pipeline_version(path) == version:
+        return spacy.load(path)
+    print(f"WARNING: {path} is missing or out of date, building the pipeline "
+          f"(run python3 -m conviction_pipeline to save it)")
+    return build_pipeline()
+
+if __name__ == "__main__":
+    nlp = build_pipeline()
+    nlp.to_disk(PIPELINE_DIR)
+    print(f"wrote {PIPELINE_DIR} (version {nlp.meta[PIPELINE_VERSION_KEY]}, pipes {nlp.pipe_names})")
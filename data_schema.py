@@ -0,0 +1,115 @@
+import json
+import os
+import shutil
+import pandas as pd
+
+# Low-cardinality columns of the processed output. Stored as pandas categoricals
+# (dictionary-encoded) so each row only holds a small integer code.
+CATEGORICAL_COLUMNS = ['court', 'offence_location', 'residence', 'occupation', 'gender']
+
+def schema_path(csv_path):
+    return os.path.splitext(csv_path)[0] + '.schema.json'
+
+def apply_categorical_columns(df, columns=CATEGORICAL_COLUMNS):
+    for col in columns:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+def build_schema(df):
+    return {'columns': {col: str(dtype) for col, dtype in df.dtypes.items()}}
+
+def save_schema(df, csv_path):
+    with open(schema_path(csv_path), 'w') as f:
+        json.dump(build_schema(df), f, indent=4)
+
+def load_schema(csv_path):
+    path = schema_path(csv_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def copy_schema(src_csv, dst_csv):
+    # A copy of a CSV (e.g. a timestamped save) keeps the dtypes declared for the original
+    if os.path.exists(schema_path(src_csv)):
+        shutil.copyfile(schema_path(src_csv), schema_path(dst_csv))
+
+def schema_dtypes(schema):
+    # Only dtypes that read_csv can apply while parsing; the rest are inferred as before
+    return {
+        col: dtype for col, dtype in schema['columns'].items()
+        if dtype == 'category' or dtype in ('Int64', 'boolean', 'string')
+    }
+
+def read_csv_with_schema(csv_path, **kwargs):
+    schema = load_schema(csv_path)
+    if schema:
+        kwargs.setdefault('dtype', schema_dtypes(schema))
+    return pd.read_csv(csv_path, **kwargs)
+
+def save_csv_with_schema(df, csv_path):
+    df.to_csv(csv_path, index=False)
+    save_schema(df, csv_path)
+
+def json_value(value):
+    # NaN/None -> null and numpy scalars -> Python scalars, for journals and patch files
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+def evaluate_predicate(df, predicate):
+    # A pandas expression as a per-row mask, shared by include_tool's bulk review and
+    # touchup's bulk edit and filter views. Missing results (e.g. str.contains on an
+    # empty cell) count as False.
+    result = df.eval(predicate, engine='python')
+    if not isinstance(result, pd.Series) or len(result) != len(df):
+        raise ValueError(f"'{predicate}' is not a per-row condition")
+    result = result.where(result.notna(), False)
+    if result.dtype == object:
+        result = result.infer_objects()
+    if not pd.api.types.is_bool_dtype(result):
+        raise ValueError(f"'{predicate}' must evaluate to True/False per row")
+    return result.astype(bool)
+
+def is_nullable_integer(dtype):
+    return isinstance(dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_integer_dtype(dtype)
+
+def coerce_values(dtype, values):
+    """
+    Convert edited values (usually typed text) for a nullable integer column
+    such as the date stage's year/month/day, which rejects strings outright.
+    Blank values become <NA>. Raises ValueError for anything that isn't a
+    whole number. Other dtypes are returned unchanged.
+    """
+    values = pd.Series(values, dtype=object)
+    if not is_nullable_integer(dtype):
+        return values
+    blank = values.isna() | (values.astype(str).str.strip() == '')
+    numbers = pd.to_numeric(values.where(~blank), errors='coerce')
+    bad = ~blank & (numbers.isna() | (numbers % 1 != 0))
+    if bad.any():
+        raise ValueError(f"'{values[bad].iloc[0]}' is not a whole number")
+    return numbers.astype(dtype)
+
+def coerce_value(dtype, value):
+    return coerce_values(dtype, [value]).iloc[0] if is_nullable_integer(dtype) else value
+
+def set_cell(df, row, column, value):
+    # Categorical columns only accept known categories, so register new values first
+    dtype = df.dtypes[column]
+    value = coerce_value(dtype, value)
+    if isinstance(dtype, pd.CategoricalDtype) and not pd.isna(value) and value not in dtype.categories:
+        df[column] = df[column].cat.add_categories([value])
+    df.at[row, column] = value
+
+def set_cells(df, rows, column, values):
+    # Vectorised set_cell: one .loc assignment for many rows of a column
+    dtype = df.dtypes[column]
+    if is_nullable_integer(dtype):
+        values = coerce_values(dtype, values).array
+    if isinstance(dtype, pd.CategoricalDtype):
+        new = pd.Index(pd.Series(values, dtype=object).dropna().unique()).difference(dtype.categories)
+        if len(new):
+            df[column] = df[column].cat.add_categories(new)
+    df.loc[rows, column] = values
@@ -0,0 +1,101 @@
+from datetime import date
+import pandas as pd
+
+MONTHS = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6,
+    "july": 7, "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8,
+    "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+# "26 September 1888", "2 Oct 1888", "14-18 May 1818", "3 Jan [sic] 1869", "5 Feb1887"
+DAY_MONTH_YEAR_PATTERN = (
+    r'(?P<day>\d{1,2})(?:-\d{1,2})?\s+(?P<month>[A-Za-z]+)\.?'
+    r'(?:\s*\[sic\])?\s*(?P<year>\d{4})'
+)
+ISO_PATTERN = r'^(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})$'
+
+DATE_PARTS = ['year', 'month', 'day']
+
+def format_iso_date(tokens):
+    # tokens as collected by the parser, e.g. ['26', 'September', '1888']
+    if len(tokens) != 3 or not (tokens[0].isdigit() and tokens[2].isdigit()):
+        return None
+    month = MONTHS.get(tokens[1].lower())
+    if month is None:
+        return None
+    try:
+        return date(int(tokens[2]), month, int(tokens[0])).isoformat()
+    except ValueError:
+        return None
+
+def parse_date_column(series):
+    """
+    Parse a column of date strings into integer year/month/day columns.
+    Returns (parts, failures) where failures counts non-empty values that
+    could not be parsed; empty values are left as <NA> and not counted.
+    """
+    text = series.astype('string').str.strip()
+
+    iso = text.str.extract(ISO_PATTERN)
+    dmy = text.str.extract(DAY_MONTH_YEAR_PATTERN)
+    dmy['month'] = dmy['month'].str.lower().map(MONTHS)
+
+    parts = pd.DataFrame(index=series.index)
+    for part in DATE_PARTS:
+        iso_part = pd.to_numeric(iso[part], errors='coerce')
+        dmy_part = pd.to_numeric(dmy[part], errors='coerce')
+        parts[part] = iso_part.fillna(dmy_part).astype('Int64')
+
+    # Reject impossible dates (e.g. 31 February) rather than letting them through
+    valid = pd.to_datetime(parts.astype('float64'), errors='coerce').notna()
+    parts.loc[~valid, DATE_PARTS] = pd.NA
+
+    present = text.notna() & (text != '')
+    failures = int((present & ~valid).sum())
+    return parts, failures
+
+def to_timestamps(parts):
+    return pd.to_datetime(parts[DATE_PARTS].astype('float64'), errors='coerce')
+
+def normalise_dates(df):
+    """
+    Vectorised date stage for the processed frame. Splits the parsed offence
+    'date' into year/month/day, parses 'document_date' into document_year/
+    document_month/document_day, and derives conviction_lag_days (days from
+    offence to document date). Returns (df, failures) with per-column
+    parse-failure counts.
+    """
+    failures = {}
+    lag_dates = {}
+
+    for column, prefix in (('date', ''), ('document_date', 'document_')):
+        if column not in df.columns:
+            continue
+        parts, failures[column] = parse_date_column(df[column])
+        for part in DATE_PARTS:
+            df[f'{prefix}{part}'] = parts[part]
+        lag_dates[column] = to_timestamps(parts)
+
+    if len(lag_dates) == 2:
+        df['conviction_lag_days'] = (lag_dates['document_date'] - lag_dates['date']).dt.days.astype('Int64')
+
+    if 'date' in df.columns:
+        df = df.drop(columns=['date'])
+
+    return df, failures
+
+
+########################
+# Tests below here
+########################
+
+def test_parse_date_column():
+    parts, failures = parse_date_column(pd.Series(
+        ['14-18 May 1818', '3 Jan [sic] 1869', '31 Feb 1888', '1888-09-26', None, '']))
+    assert parts.iloc[:2].values.tolist() == [[1818, 5, 14], [1869, 1, 3]]
+    assert parts.iloc[3].tolist() == [1888, 9, 26]
+    assert parts.iloc[[2, 4, 5]].isna().all().all()
+    # 31 February is counted; empty values are not
+    assert failures == 1
+    assert str(parts['year'].dtype) == 'Int64'
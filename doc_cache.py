@@ -0,0 +1,73 @@
+## python3 -m doc_cache    (annotates every description into cache/)
+
+import argparse
+import os
+import pandas as pd
+from spacy.tokens import DocBin
+from text_normaliser import normalise_descriptions, text_hash
+
+CACHE_DIR = "cache"
+CACHE_INPUT = "data/whitby.csv"
+
+def cache_path(pipeline_version, cache_dir=CACHE_DIR):
+    # One file per pipeline version, so a rebuilt pipeline never reads stale annotations
+    return os.path.join(cache_dir, f"docs_{pipeline_version}.spacy")
+
+class DocCache:
+    """
+    Annotated spaCy Docs keyed by the hash of the text they were parsed from,
+    persisted as a DocBin. Lets extractors run straight off deserialised Docs
+    instead of re-parsing the corpus.
+    """
+    def __init__(self, vocab, pipeline_version, cache_dir=CACHE_DIR):
+        self.path = cache_path(pipeline_version, cache_dir)
+        self.docs = {}
+        self.added = 0
+        if os.path.exists(self.path):
+            doc_bin = DocBin(store_user_data=True).from_disk(self.path)
+            for doc in doc_bin.get_docs(vocab):
+                self.docs[doc.user_data["text_hash"]] = doc
+
+    def __len__(self):
+        return len(self.docs)
+
+    def get(self, text):
+        return self.docs.get(text_hash(text))
+
+    def add(self, text, doc):
+        doc.user_data["text_hash"] = text_hash(text)
+        self.docs[doc.user_data["text_hash"]] = doc
+        self.added += 1
+
+    def parse(self, nlp_processor, text):
+        doc = self.get(text)
+        if doc is None:
+            doc = nlp_processor(text)
+            self.add(text, doc)
+        return doc
+
+    def save(self):
+        if not self.added:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        DocBin(store_user_data=True, docs=self.docs.values()).to_disk(tmp_path)
+        os.replace(tmp_path, self.path)
+        print(f"wrote {self.path} ({len(self.docs)} docs, {self.added} new)")
+        self.added = 0
+
+if __name__ == "__main__":
+    from summary_conviction_parser import PIPELINE_VERSION, nlp_processor
+
+    parser = argparse.ArgumentParser(description="Pre-annotate descriptions into the DocBin cache.")
+    parser.add_argument('--input', default=CACHE_INPUT, help="CSV with a 'description' column.")
+    parser.add_argument('--processes', type=int, default=1, help="spaCy nlp.pipe processes.")
+    args = parser.parse_args()
+
+    cache = DocCache(nlp_processor.vocab, PIPELINE_VERSION)
+    texts = normalise_descriptions(pd.read_csv(args.input)['description'].dropna()).unique()
+    missing = [text for text in texts if cache.get(text) is None]
+    print(f"{len(texts)} descriptions, {len(texts) - len(missing)} already cached")
+    for text, doc in zip(missing, nlp_processor.pipe(missing, batch_size=256, n_process=args.processes)):
+        cache.add(text, doc)
+    cache.save()
@@ -0,0 +1,40 @@
+"""
+facets.py - Value and null counts per column for touchup's facet command.
+
+A column's counts are computed once with value_counts when first asked for,
+then kept current by update(old, new) on every edit instead of recounting.
+"""
+
+import heapq
+import pandas as pd
+
+class ColumnFacets:
+    def __init__(self, series):
+        # Categoricals report unused categories with a count of 0
+        self.counts = {value: count for value, count in series.value_counts(dropna=True).items() if count}
+        self.nulls = int(series.isna().sum())
+
+    def _add(self, value, n):
+        if pd.isna(value):
+            self.nulls += n
+            return
+        count = self.counts.get(value, 0) + n
+        if count > 0:
+            self.counts[value] = count
+        else:
+            self.counts.pop(value, None)
+
+    def update(self, old, new):
+        self._add(old, -1)
+        self._add(new, 1)
+
+    @property
+    def distinct(self):
+        return len(self.counts)
+
+    def most_common(self, n):
+        return heapq.nlargest(n, self.counts.items(), key=lambda item: item[1])
+
+    def rarest(self, n):
+        # Rare values are where parser mistakes tend to show up
+        return heapq.nsmallest(n, self.counts.items(), key=lambda item: (item[1], str(item[0])))
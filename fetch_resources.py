@@ -1,4 +1,6 @@
+import argparse
 import json
+import os
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
@@ -51,9 +53,21 @@ def process_json_to_dataframe(json_file):
 
     return pd.DataFrame(records)
 
-if __name__ == "__main__":
-    FILE_NAME = 'whitby'
-    json_file = FILE_NAME + '.json'
+INPUT_FILE = 'whitby.json'
+
+def fetch_resources(json_file, output_file=None):
+    output_file = output_file or os.path.splitext(json_file)[0] + '.csv'
     df = process_json_to_dataframe(json_file)
     print(df)
-    df.to_csv(FILE_NAME + '.csv', index=False)
\ No newline at end of file
+    df.to_csv(output_file, index=False)
+    return output_file
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch each listed record's catalogue page into a CSV.")
+    parser.add_argument('--input', default=INPUT_FILE, help="JSON written by list_resources.")
+    parser.add_argument('--output', default=None, help="CSV to write (default: the input name with .csv).")
+    args = parser.parse_args(argv)
+    fetch_resources(args.input, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+## python3 -m gender_lookup    (rebuilds data/forename_gender.pickle)
+
+import functools
+import os
+import pickle
+
+GENDER_TABLE_FILE = "data/forename_gender.pickle"
+GENDER_OVERRIDES_FILE = "data/gender_overrides.txt"
+
+GENDER_MAP = {"male": "male", "mostly_male": "male", "female": "female", "mostly_female": "female"}
+# The table stores one character per name to keep it small
+GENDER_CODES = {"m": "male", "f": "female"}
+
+def load_overrides(path=GENDER_OVERRIDES_FILE):
+    overrides = {}
+    if not os.path.exists(path):
+        return overrides
+    with open(path, 'r') as file:
+        for line in file:
+            if line.strip():
+                name, gender = line.strip().split(',')
+                overrides[name.strip().lower()] = gender.strip()
+    return overrides
+
+def build_gender_table(overrides=None):
+    # gender_guesser is only needed here; it parses its whole name file on construction
+    import gender_guesser.detector as gender
+    detector = gender.Detector(case_sensitive=False)
+
+    table = {}
+    for name in detector.names:
+        resolved = GENDER_MAP.get(detector.get_gender(name))
+        if resolved:
+            table[name] = resolved[0]
+
+    for name, resolved in (overrides or {}).items():
+        table[name] = resolved[0]
+
+    return table
+
+def save_gender_table(table, path=GENDER_TABLE_FILE):
+    with open(path, 'wb') as file:
+        pickle.dump(table, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+@functools.lru_cache(maxsize=None)
+def load_gender_table(path=GENDER_TABLE_FILE):
+    # Loaded once per process; call before forking workers so they share the pages
+    if os.path.exists(path):
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+    print(f"WARNING: {path} not found, building forename table from gender_guesser")
+    return build_gender_table(load_overrides())
+
+@functools.lru_cache(maxsize=4096)
+def lookup_gender(first_name):
+    return GENDER_CODES.get(load_gender_table().get(first_name.lower()))
+
+if __name__ == "__main__":
+    table = build_gender_table(load_overrides())
+    save_gender_table(table)
+    print(f"wrote {GENDER_TABLE_FILE} ({len(table)} forenames)")
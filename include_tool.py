@@ -1,29 +1,185 @@
 ## python3 -m  include_tool --file data.csv --reset
 ## python3 -m  include_tool --file data.csv
 ## python3 -m  include_tool 
+## python3 -m  include_tool --file big.csv --lazy
+## python3 -m  include_tool --file data.csv --bulk "y:court == 'Whitby' and offence.str.contains('drunk')"
 
 import pandas as pd
+import io
 import os
+import sys
 import argparse
+import json
 from datetime import datetime
 from colorama import init, Fore, Style
+from data_schema import evaluate_predicate, json_value, read_csv_with_schema, set_cell
+from lazy_csv import LazyFrame, load_keyed_array, replace_csv, save_keyed_array
+from screen import Screen
+from parser_service import ParserServiceError, reparse_row
 
 init(autoreset=True)
 
+screen = Screen()
+
 def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    screen.clear()
 
 def timestamp():
     return f"{Style.DIM}[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}]"
 
-def load_csv(filepath):
+def load_csv(filepath, lazy=False):
     if not os.path.exists(filepath):
         print(f"{timestamp()} {Fore.RED}❌ File not found: {filepath}")
         return None
-    return pd.read_csv(filepath)
+    # Lazy mode pages rows in from a memory-mapped file instead of reading it all
+    return LazyFrame(filepath) if lazy else read_csv_with_schema(filepath)
 
 def save_csv(df, filepath):
-    df.to_csv(filepath, index=False)
+    # Write-then-rename so a crash mid-write never leaves a truncated CSV
+    tmp_path = filepath + '.tmp'
+    df.to_csv(tmp_path, index=False)
+    replace_csv(tmp_path, filepath)
+
+def pending_rows_path(filepath):
+    return filepath + '.pending.npy'
+
+class DecisionJournal:
+    """
+    Append-only log of cell changes, fsynced per entry, so a keystroke costs
+    one small write instead of rewriting the CSV. compact() folds the log
+    into the data file; replay() re-applies a log left behind by a crash.
+    """
+    COMPACT_EVERY = 500
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.path = filepath + '.journal'
+        self.pending = 0
+        self.queue = None  # set by process_rows; its pending rows are saved on compact
+
+    def append(self, row_idx, column, value):
+        self._write({'row': json_value(row_idx), 'col': column, 'value': json_value(value)})
+
+    def append_many(self, row_indices, column, value):
+        # One entry (and one fsync) for a bulk decision
+        self._write({'rows': [json_value(i) for i in row_indices], 'col': column, 'value': json_value(value)})
+
+    def _write(self, entry):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.pending += 1
+
+    def replay(self, df):
+        if not os.path.exists(self.path):
+            return 0
+        count = 0
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn final line from a crash mid-append
+                if entry['col'] not in df.columns:
+                    df[entry['col']] = None
+                if 'rows' in entry:
+                    df.loc[entry['rows'], entry['col']] = entry['value']
+                else:
+                    set_cell(df, entry['row'], entry['col'], entry['value'])
+                count += 1
+        self.pending = count
+        return count
+
+    def compact(self, df):
+        save_csv(df, self.filepath)
+        if self.queue is not None:
+            save_keyed_array(self.filepath, pending_rows_path(self.filepath), self.queue.pending())
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.pending = 0
+
+    def maybe_compact(self, df):
+        if self.pending >= self.COMPACT_EVERY:
+            self.compact(df)
+
+def record_bulk_edit(df, journal, row_indices, column, value):
+    df.loc[row_indices, column] = value
+    journal.append_many(row_indices, column, value)
+    journal.maybe_compact(df)
+
+def record_edit(df, journal, row_idx, column, value):
+    set_cell(df, row_idx, column, value)
+    journal.append(row_idx, column, value)
+    journal.maybe_compact(df)
+
+class ReviewQueue:
+    """
+    Review order for process_rows. Rows are visited in file order and a
+    skipped row is re-queued at the end. Each row remembers its live position
+    in the order, so a decision, skip or undo is O(1) and undo returns the
+    reviewer to the undone row instead of restarting from the top.
+    """
+    def __init__(self, row_indices):
+        self.order = list(row_indices)
+        self.position = {row: i for i, row in enumerate(self.order)}
+        self.status = dict.fromkeys(self.order, 'unreviewed')
+        self.counts = {'unreviewed': len(self.order), 'skipped': 0, 'reviewed': 0}
+        self.cursor = 0
+
+    def __len__(self):
+        return self.counts['unreviewed'] + self.counts['skipped']
+
+    def _set_status(self, row, status):
+        self.counts[self.status[row]] -= 1
+        self.counts[status] += 1
+        self.status[row] = status
+
+    def current(self):
+        # Entries left behind by a skip, or rows already decided, are passed over
+        while self.cursor < len(self.order):
+            row = self.order[self.cursor]
+            if self.position[row] == self.cursor and self.status[row] != 'reviewed':
+                return row
+            self.cursor += 1
+        return None
+
+    def decide(self, row):
+        # Returns the row's position, which undo() needs to return to it
+        self._set_status(row, 'reviewed')
+        self.cursor += 1
+        return self.position[row]
+
+    def skip(self, row):
+        self._set_status(row, 'skipped')
+        self.requeue(row)
+        self.cursor += 1
+
+    def requeue(self, row):
+        self.position[row] = len(self.order)
+        self.order.append(row)
+
+    def undo(self, row, position):
+        self._set_status(row, 'unreviewed')
+        self.position[row] = position
+        self.cursor = position
+
+    def decide_many(self, rows):
+        # Bulk decisions leave the cursor alone; decided rows are passed over when reached
+        for row in rows:
+            self._set_status(row, 'reviewed')
+        return [self.position[row] for row in rows]
+
+    def pending(self):
+        # Rows still to be decided, in file order
+        return sorted(row for row, status in self.status.items() if status != 'reviewed')
+
+    def undo_many(self, rows):
+        # Rows the cursor has already passed go back on the end of the order
+        for row in rows:
+            self._set_status(row, 'unreviewed')
+            if self.position[row] < self.cursor:
+                self.requeue(row)
 
 def reset_reviewed_column(df):
     df['reviewed'] = None
@@ -37,7 +193,7 @@ def prompt_for_file_and_reset():
     return filepath, (reset == 'y')
 
 def cast_value(df, row_idx, column, value_str):
-    dtype = df[column].dtype
+    dtype = df.dtypes[column]
     try:
         if pd.api.types.is_integer_dtype(dtype):
             return int(value_str)
@@ -57,10 +213,22 @@ def cast_value(df, row_idx, column, value_str):
         print(f"{Fore.RED}⚠️ Value conversion error: {e}")
         return value_str
 
+def edit_cell(df, journal, row_idx, column, value_str):
+    value = cast_value(df, row_idx, column, value_str)
+    try:
+        record_edit(df, journal, row_idx, column, value)
+    except ValueError as e:
+        # e.g. text typed into a nullable integer column such as year
+        print(f"{Fore.RED}❌ '{column}' not updated: {e}")
+        return
+    print(f"{Fore.GREEN}✓ Updated '{column}' to '{value}'")
+
+def row_lines(row, exclude_cols=['reviewed']):
+    return [f"{Fore.YELLOW}{col}: {Style.RESET_ALL}{value}" for col, value in row.items() if col not in exclude_cols]
+
 def print_row(row, exclude_cols=['reviewed']):
-    for col in row.index:
-        if col not in exclude_cols:
-            print(f"{Fore.YELLOW}{col}: {Style.RESET_ALL}{row[col]}")
+    for line in row_lines(row, exclude_cols):
+        print(line)
 
 def print_help():
     clear_screen()
@@ -74,13 +242,17 @@ Usage Commands:
  edit       - Enter field editing mode
  edit <field>             - Edit the specified field interactively
  edit <field> <new_value> - Edit the specified field with new value directly
+ reparse    - Re-parse the description via the parser service and offer refreshed fields
+ bulk <y|n> <predicate>   - Mark every unreviewed row matching a pandas expression,
+                            e.g. bulk y court == 'Whitby' and offence.str.contains('drunk')
+                            (previewed first; one undo reverts the whole batch)
  help / h   - Show this help message
 {Style.RESET_ALL}
 Press Enter to return to the current row...
 """)
     input()
 
-def edit_row_fields(df, row_idx, filepath):
+def edit_row_fields(df, row_idx, journal):
     editable_cols = [col for col in df.columns if col != 'reviewed']
 
     while True:
@@ -108,23 +280,82 @@ def edit_row_fields(df, row_idx, filepath):
         old_value = df.at[row_idx, choice]
         new_value = input(f"{Fore.CYAN}Enter new value for {choice} [{old_value}]: ").strip()
         if new_value != "":
-            new_value_casted = cast_value(df, row_idx, choice, new_value)
-            df.at[row_idx, choice] = new_value_casted
-            save_csv(df, filepath)
-            print(f"{Fore.GREEN}✓ Updated '{choice}' to '{new_value_casted}'")
+            edit_cell(df, journal, row_idx, choice, new_value)
         else:
             print(f"{Fore.YELLOW}No change made to '{choice}'.")
         input(f"{Style.DIM}Press Enter to continue...")
 
+def reparse_fields(df, row_idx, journal):
+    try:
+        changes = reparse_row(df.loc[row_idx])
+    except ParserServiceError as e:
+        print(f"{Fore.RED}❌ {e}")
+        input(f"{Style.DIM}Press Enter to continue...")
+        return
+
+    if not changes:
+        print(f"{Fore.GREEN}✔ Parsed fields are already up to date.")
+        input(f"{Style.DIM}Press Enter to continue...")
+        return
+
+    print(f"\n{Fore.CYAN}Refreshed fields for row {row_idx}:")
+    for col, new_value in changes.items():
+        print(f"{Fore.YELLOW}{col}: {Style.RESET_ALL}{df.at[row_idx, col]} {Fore.CYAN}→ {Style.RESET_ALL}{new_value}")
+    screen.invalidate()  # the listing may have scrolled the frame
+    confirm = input(f"{Fore.CYAN}Apply refreshed fields? (y/n): ").strip().lower()
+    if confirm == 'y':
+        for col, new_value in changes.items():
+            record_edit(df, journal, row_idx, col, new_value)
+        print(f"{Fore.GREEN}✓ Updated {len(changes)} fields.")
+    else:
+        print(f"{Fore.YELLOW}No change made.")
+    input(f"{Style.DIM}Press Enter to continue...")
+
+def bulk_review(df, journal, queue, decision, predicate):
+    """
+    Preview and apply one decision to every unreviewed row matching predicate.
+    Returns the history entry for undo, or None if nothing was applied.
+    """
+    try:
+        mask = evaluate_predicate(df, predicate) & df['reviewed'].isna()
+    except Exception as e:
+        print(f"{Fore.RED}❌ Invalid predicate: {e}")
+        input(f"{Style.DIM}Press Enter to continue...")
+        return None
+
+    rows = df.index[mask].tolist()
+    value = 'yes' if decision == 'y' else 'no'
+    print(f"\n{Fore.CYAN}{len(rows)} unreviewed rows match: {Style.RESET_ALL}{predicate}")
+    if not rows:
+        input(f"{Style.DIM}Press Enter to continue...")
+        return None
+    preview_cols = [col for col in df.columns if col != 'reviewed'][:6]
+    print(df.loc[rows[:5], preview_cols].to_string(max_colwidth=40))
+    screen.invalidate()  # the preview may have scrolled the frame
+    confirm = input(f"{Fore.CYAN}Mark all {len(rows)} as reviewed: {value}? (y/n): ").strip().lower()
+    if confirm != 'y':
+        print(f"{Fore.YELLOW}No change made.")
+        input(f"{Style.DIM}Press Enter to continue...")
+        return None
+
+    prev_values = df.loc[rows, 'reviewed'].tolist()
+    record_bulk_edit(df, journal, rows, 'reviewed', value)
+    positions = queue.decide_many(rows)
+    print(f"\n{timestamp()} {Fore.GREEN}✔ {len(rows)} rows marked as reviewed: {value}. Saved.")
+    input(f"{Style.DIM}Press Enter to continue...")
+    return list(zip(rows, prev_values, positions))
+
 def ask_user(row, current_num, total_remaining, global_index, df):
-    clear_screen()
-    print(f"{Fore.CYAN}📄 Row {current_num}/{total_remaining} (CSV index {global_index})\n")
-    print_row(row)
+    # Consecutive rows share most lines, so only the changed ones are repainted
+    frame = ([f"{Fore.CYAN}📄 Row {current_num}/{total_remaining} (CSV index {global_index}){Style.RESET_ALL}", ""]
+             + row_lines(row))
+    screen.render(frame)
 
     prompt = (
         f"\n{Fore.GREEN}Mark this row as reviewed? {Fore.YELLOW}[y]{Style.RESET_ALL}/"
         f"{Fore.RED}[n]{Style.RESET_ALL}, {Fore.CYAN}'skip'{Style.RESET_ALL}, "
         f"{Fore.MAGENTA}'undo'{Style.RESET_ALL}, {Fore.BLUE}'edit <field> [value]'{Style.RESET_ALL}, "
+        f"{Fore.BLUE}'reparse'{Style.RESET_ALL}, {Fore.BLUE}'bulk <y|n> <predicate>'{Style.RESET_ALL}, "
         f"{Fore.CYAN}'help'{Style.RESET_ALL}\n"
         f"Choice: "
     )
@@ -132,11 +363,23 @@ def ask_user(row, current_num, total_remaining, global_index, df):
         decision = input(prompt).strip()
         lower = decision.lower()
 
-        if lower in ['y', 'n', 'undo', 'skip', 's']:
+        if lower in ['y', 'n', 'undo', 'skip', 's', 'reparse']:
             return lower, None, None
 
         if lower in ['help', 'h']:
             print_help()
+            screen.render(frame)
+            continue
+
+        # Edits, bulk rules and retries print more below the frame than it leaves
+        # room for, so the next row is repainted in full
+        screen.invalidate()
+
+        if lower.startswith('bulk'):
+            parts = decision.split(maxsplit=2)
+            if len(parts) == 3 and parts[1].lower() in ['y', 'n']:
+                return 'bulk', parts[1].lower(), parts[2]
+            print(f"{Fore.RED}❌ Usage: bulk <y|n> <predicate>")
             continue
 
         if lower.startswith('edit'):
@@ -160,9 +403,10 @@ def ask_user(row, current_num, total_remaining, global_index, df):
                     print(f"{Fore.RED}❌ Field '{field}' does not exist or is not editable.")
                     continue
 
-        print(f"{Fore.RED}❌ Invalid input. Please enter one of: y, n, skip, undo, edit <field> [value], help.")
+        print(f"{Fore.RED}❌ Invalid input. Please enter one of: y, n, skip, undo, edit <field> [value], reparse, bulk <y|n> <predicate>, help.")
 
-def process_rows(df, filepath, do_reset=False):
+def process_rows(df, filepath, do_reset=False, journal=None, bulk_rules=()):
+    journal = journal or DecisionJournal(filepath)
     if 'reviewed' not in df.columns:
         df['reviewed'] = None
     elif do_reset:
@@ -171,98 +415,110 @@ def process_rows(df, filepath, do_reset=False):
         confirm = input(f"{Fore.CYAN}Confirm reset? This cannot be undone. (y/n): ").strip().lower()
         if confirm == 'y':
             reset_reviewed_column(df)
-            save_csv(df, filepath)
+            journal.compact(df)
         else:
             print(f"{Fore.GREEN}✅ Reset cancelled.")
             input(f"{Style.DIM}Press Enter to continue...")
 
     history = []
-    unreviewed = df[df['reviewed'].isna()].index.tolist()
-    skipped = []
-    index = 0
+    rows = None
+    if isinstance(df, LazyFrame):
+        # Reading a lazy file's reviewed column parses the whole file; the rows left
+        # pending at the last compaction are valid for as long as the file is unchanged
+        rows = load_keyed_array(filepath, pending_rows_path(filepath))
+    queue = ReviewQueue(df.index[df['reviewed'].isna()] if rows is None else rows.tolist())
+    journal.queue = queue
 
     clear_screen()
     print(f"{Fore.CYAN}Processing file: {filepath}")
     print(f"{Fore.CYAN}Total rows: {len(df)}")
-    print(f"{Fore.CYAN}Rows to review: {len(unreviewed)}")
+    print(f"{Fore.CYAN}Rows to review: {len(queue)}")
     input(f"{Style.DIM}Press Enter to start reviewing...")
 
-    if not unreviewed:
+    for rule in bulk_rules:
+        decision, _, predicate = rule.partition(':')
+        decision = decision.strip().lower()
+        if decision not in ['y', 'n']:
+            print(f"{Fore.RED}❌ Ignoring bulk rule '{rule}': expected y:<predicate> or n:<predicate>")
+            continue
+        if entry := bulk_review(df, journal, queue, decision, predicate.strip()):
+            history.append(entry)
+
+    if not queue:
         print(f"{Fore.GREEN}✅ All rows have already been processed.")
         return
 
-    while unreviewed or skipped:
-        if index >= len(unreviewed):
-            unreviewed, skipped = skipped, []
-            index = 0
-            if not unreviewed:
-                break
-
-        row_idx = unreviewed[index]
+    while (row_idx := queue.current()) is not None:
         row = df.loc[row_idx]
-        current = index + 1
-        total = len(unreviewed)
+        # Stale entries left in queue.order by skips don't count towards the total
+        current = queue.counts['reviewed'] + 1
+        total = queue.counts['reviewed'] + len(queue)
 
         decision, field, value = ask_user(row, current, total, row_idx, df)
 
         if decision == 'edit':
-            edit_row_fields(df, row_idx, filepath)
+            edit_row_fields(df, row_idx, journal)
             continue
 
         elif decision == 'edit_field':
             old_value = df.at[row_idx, field]
             new_value = input(f"{Fore.CYAN}Enter new value for {field} [{old_value}]: ").strip()
             if new_value != "":
-                new_value_casted = cast_value(df, row_idx, field, new_value)
-                df.at[row_idx, field] = new_value_casted
-                save_csv(df, filepath)
-                print(f"{Fore.GREEN}✓ Updated '{field}' to '{new_value_casted}'")
+                edit_cell(df, journal, row_idx, field, new_value)
             else:
                 print(f"{Fore.YELLOW}No change made to '{field}'.")
             input(f"{Style.DIM}Press Enter to continue...")
             continue
 
         elif decision == 'edit_field_value':
-            new_value_casted = cast_value(df, row_idx, field, value)
-            df.at[row_idx, field] = new_value_casted
-            save_csv(df, filepath)
-            print(f"{Fore.GREEN}✓ Updated '{field}' to '{new_value_casted}'")
+            edit_cell(df, journal, row_idx, field, value)
             input(f"{Style.DIM}Press Enter to continue...")
             continue
 
+        elif decision == 'reparse':
+            reparse_fields(df, row_idx, journal)
+            continue
+
+        elif decision == 'bulk':
+            if entry := bulk_review(df, journal, queue, field, value):
+                history.append(entry)
+            continue
+
         elif decision == 'undo':
             if not history:
                 print(f"{Fore.YELLOW}⚠️ Nothing to undo.")
                 input(f"{Style.DIM}Press Enter to continue...")
                 continue
-            last_idx, prev_value = history.pop()
-            df.at[last_idx, 'reviewed'] = prev_value
-            save_csv(df, filepath)
-            print(f"\n{timestamp()} {Fore.MAGENTA}↩️ Undo: Reverted 'reviewed' on row {last_idx}.")
+            entry = history.pop()
+            if len(entry) == 1:
+                last_idx, prev_value, position = entry[0]
+                record_edit(df, journal, last_idx, 'reviewed', prev_value)
+                queue.undo(last_idx, position)
+                print(f"\n{timestamp()} {Fore.MAGENTA}↩️ Undo: Reverted 'reviewed' on row {last_idx}.")
+            else:
+                rows = [row for row, _, _ in entry]
+                # Bulk decisions only ever apply to unreviewed rows, so the previous value is empty
+                record_bulk_edit(df, journal, rows, 'reviewed', None)
+                queue.undo_many(rows)
+                print(f"\n{timestamp()} {Fore.MAGENTA}↩️ Undo: Reverted 'reviewed' on {len(rows)} rows.")
             input(f"{Style.DIM}Press Enter to continue...")
-            unreviewed = df[df['reviewed'].isna()].index.tolist()
-            skipped = []
-            index = 0
             continue
 
         elif decision in ['skip', 's']:
             print(f"\n{timestamp()} {Fore.YELLOW}⏭️ Skipped row {row_idx} — no changes made.")
             input(f"{Style.DIM}Press Enter to continue...")
-            skipped.append(row_idx)
-            index += 1
+            queue.skip(row_idx)
             continue
 
         elif decision in ['y', 'n']:
             prev_value = df.at[row_idx, 'reviewed']
-            history.append((row_idx, prev_value))
-            df.at[row_idx, 'reviewed'] = 'yes' if decision == 'y' else 'no'
-            save_csv(df, filepath)
+            record_edit(df, journal, row_idx, 'reviewed', 'yes' if decision == 'y' else 'no')
+            history.append([(row_idx, prev_value, queue.decide(row_idx))])
             print(f"\n{timestamp()} {Fore.GREEN}✔ Row {row_idx} marked as reviewed: {'yes' if decision=='y' else 'no'}. Saved.")
             input(f"{Style.DIM}Press Enter to continue...")
-            index += 1
             continue
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description="Interactive CSV row review tool.",
         epilog="Example usage:\n  python tool.py --file data.csv --reset\n\n"
@@ -271,8 +527,13 @@ def main():
     )
     parser.add_argument('--file', help="Path to the CSV file.")
     parser.add_argument('--reset', action='store_true', help="Reset all 'reviewed' values.")
+    parser.add_argument('--bulk', action='append', default=[], metavar="Y|N:PREDICATE",
+                        help="Before manual review, mark unreviewed rows matching a pandas expression, "
+                             "e.g. \"y:court == 'Whitby' and offence.str.contains('drunk')\". Repeatable.")
+    parser.add_argument('--lazy', action='store_true',
+                        help="Page rows in on demand instead of loading the whole CSV (for very large files).")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if not args.file:
         filepath, do_reset = prompt_for_file_and_reset()
@@ -280,11 +541,127 @@ def main():
         filepath = args.file
         do_reset = args.reset
 
-    df = load_csv(filepath)
+    df = load_csv(filepath, lazy=args.lazy)
     if df is not None:
-        process_rows(df, filepath, do_reset=do_reset)
+        journal = DecisionJournal(filepath)
+        replayed = journal.replay(df)
+        if replayed:
+            print(f"{timestamp()} {Fore.YELLOW}🔁 Recovered {replayed} unsaved changes from {journal.path}.")
+            journal.compact(df)
+        try:
+            process_rows(df, filepath, do_reset=do_reset, journal=journal, bulk_rules=args.bulk)
+        finally:
+            if journal.pending:
+                journal.compact(df)
         clear_screen()
         print(f"{Fore.GREEN}🎉 All done! CSV saved to {filepath}")
 
 if __name__ == "__main__":
     main()
+
+
+########################
+# Tests below here
+########################
+
+def test_journal_replay_stops_at_torn_last_line(tmp_path):
+    path = str(tmp_path / "review.csv")
+    pd.DataFrame({'name': ['a', 'b', 'c'], 'reviewed': ['yes', None, None]}).to_csv(path, index=False)
+    journal = DecisionJournal(path)
+    journal.append(1, 'reviewed', 'no')
+    journal.append_many([0, 2], 'reviewed', 'no')
+    with open(journal.path, 'a') as f:
+        f.write('{"row": 2, "col": "reviewed", "val')  # crash mid-append
+
+    df = pd.read_csv(path)
+    recovered = DecisionJournal(path)
+    assert recovered.replay(df) == 2
+    assert df['reviewed'].tolist() == ['no', 'no', 'no']
+    recovered.compact(df)
+    assert not os.path.exists(recovered.path)
+    assert pd.read_csv(path)['reviewed'].tolist() == ['no', 'no', 'no']
+
+def test_queue_undo_returns_to_undone_row_after_skips():
+    queue = ReviewQueue([0, 1, 2])
+    position = queue.decide(queue.current())
+    queue.skip(queue.current())
+    queue.skip(queue.current())
+    assert queue.current() == 1  # skipped rows come round again
+    queue.undo(0, position)
+    assert queue.current() == 0
+    assert len(queue) == 3
+    queue.decide(0)
+    assert queue.current() == 1
+    queue.decide(1)
+    assert queue.current() == 2
+    queue.decide(2)
+    assert queue.current() is None and len(queue) == 0
+
+def test_bulk_undo_requeues_rows_already_passed(monkeypatch, tmp_path):
+    path = str(tmp_path / "review.csv")
+    df = pd.DataFrame({'court': ['Whitby', 'Scarborough', 'Whitby', 'Leeds'], 'reviewed': [None] * 4})
+    choices = iter(['skip', 'n', "bulk y court == 'Whitby'", 'undo', 'y', 'y', 'n'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(choices) if 'Choice' in prompt else 'y')
+    shown = []
+    real_ask_user = ask_user
+    def recording_ask_user(row, current_num, total_remaining, global_index, df):
+        shown.append(global_index)
+        return real_ask_user(row, current_num, total_remaining, global_index, df)
+    monkeypatch.setattr(sys.modules[__name__], 'ask_user', recording_ask_user)
+
+    process_rows(df, path)
+    # The bulk decision covered skipped row 0 and row 2; undoing it at row 3 brings
+    # row 2 (already passed) back after row 0 (still queued from the skip)
+    assert shown == [0, 1, 2, 3, 3, 0, 2]
+    assert df['reviewed'].tolist() == ['yes', 'no', 'no', 'yes']
+
+def test_edit_nullable_integer_column(monkeypatch, tmp_path, capsys):
+    path = str(tmp_path / "review.csv")
+    with open(path, 'w') as f:
+        f.write("offence,year\ndrunk,1888\ntheft,\n")
+    with open(tmp_path / "review.schema.json", 'w') as f:
+        f.write('{"columns": {"year": "Int64"}}')
+    df = read_csv_with_schema(path)
+    choices = iter(['edit year abc', 'edit year 1890', 'y', 'y'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(choices) if 'Choice' in prompt else '')
+
+    process_rows(df, path)
+    assert "'year' not updated: 'abc' is not a whole number" in capsys.readouterr().out
+    assert df['year'].tolist()[0] == 1890 and str(df['year'].dtype) == 'Int64'
+    assert df['reviewed'].tolist() == ['yes', 'yes']
+
+def test_row_counter_ignores_skipped_entries(monkeypatch, tmp_path):
+    df = pd.DataFrame({'name': list('abcdefghij'), 'reviewed': [None] * 10})
+    choices = iter(['skip', 'skip', 'skip', 'y'])
+    def scripted_input(prompt=''):
+        if 'Choice' not in prompt:
+            return ''
+        try:
+            return next(choices)
+        except StopIteration:
+            raise KeyboardInterrupt
+    monkeypatch.setattr('builtins.input', scripted_input)
+    headers = []
+    real_ask_user = ask_user
+    def recording_ask_user(row, current_num, total_remaining, global_index, df):
+        headers.append((current_num, total_remaining))
+        return real_ask_user(row, current_num, total_remaining, global_index, df)
+    monkeypatch.setattr(sys.modules[__name__], 'ask_user', recording_ask_user)
+
+    try:
+        process_rows(df, str(tmp_path / "review.csv"))
+    except KeyboardInterrupt:
+        pass
+    assert headers == [(1, 10), (1, 10), (1, 10), (1, 10), (2, 10)]
+
+def test_invalid_input_forces_full_repaint(monkeypatch):
+    class FakeTerminal(io.StringIO):
+        def isatty(self):
+            return True
+    monkeypatch.setattr(screen, 'out', FakeTerminal())
+    df = pd.DataFrame({'name': ['a'], 'reviewed': [None]})
+    choices = iter(['bogus', 'y'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(choices))
+    assert ask_user(df.loc[0], 1, 1, 0, df)[0] == 'y'
+    # The error message sits below the frame, so the next row must not be diffed against it
+    assert screen.lines is None
@@ -0,0 +1,305 @@
+"""
+lazy_csv.py - Paged, memory-mapped CSV backend for the review tools.
+
+LazyFrame stands in for the DataFrame that include_tool and touchup hold,
+without reading the whole file up front:
+
+- A byte-offset index of record starts is built once (numpy scan of the
+  mapped file, quote-aware so quoted newlines don't split records) and
+  persisted next to the CSV as <file>.rowidx.npy, keyed by size and mtime.
+- Rows are decoded on demand a page at a time; recently used pages are
+  kept in an LRU.
+- Edits live in an overlay and are merged on read and on to_csv(), which
+  streams unchanged pages straight from the mapped file and saves the new
+  file's row index as it goes.
+
+Only the slice of the pandas API the review tools use is provided
+(columns, dtypes, len, iloc/loc/at, column access, eval, to_csv, copy).
+Whole-column operations (column access, eval) still read the full file.
+"""
+
+import csv
+import functools
+import io
+import mmap
+import os
+import numpy as np
+import pandas as pd
+from data_schema import load_schema, schema_dtypes
+
+PAGE_ROWS = 256
+CACHE_PAGES = 64
+SCAN_CHUNK = 8 * 1024 * 1024
+
+def row_index_path(csv_path):
+    return csv_path + '.rowidx.npy'
+
+def record_ends(data):
+    """
+    Offsets just past every record-ending newline in a uint8 array. A newline
+    ends a record only when the quotes before it are balanced; quote parity
+    is tracked with a uint8 XOR-accumulate, one chunk at a time, so the scan
+    needs a few bytes of scratch per byte of chunk rather than per file.
+    """
+    ends = []
+    parity = 0
+    for start in range(0, len(data), SCAN_CHUNK):
+        chunk = data[start:start + SCAN_CHUNK]
+        inside = np.bitwise_xor.accumulate(chunk == ord('"'), dtype=np.uint8)
+        inside ^= parity
+        newlines = np.flatnonzero(chunk == ord('\n'))
+        ends.append(newlines[inside[newlines] == 0] + start + 1)
+        parity = int(inside[-1])
+    return np.concatenate(ends) if ends else np.array([], dtype=np.int64)
+
+def scan_record_offsets(mm):
+    """
+    Return int64 offsets of the start of every data record plus an EOF
+    sentinel.
+    """
+    size = len(mm)
+    data = np.frombuffer(mm, dtype=np.uint8)
+    starts = record_ends(data)
+    del data  # release the buffer export so the mmap can be closed later
+    # starts[0] is the end of the header line; drop a trailing empty record
+    if len(starts) and starts[-1] == size:
+        starts = starts[:-1]
+    return np.append(starts, size).astype(np.int64)
+
+def save_keyed_array(csv_path, path, array):
+    # Stored with the CSV's size and mtime so a rewritten CSV invalidates it
+    stat = os.stat(csv_path)
+    try:
+        np.save(path, np.concatenate([[stat.st_size, stat.st_mtime_ns], array]).astype(np.int64))
+    except OSError:
+        pass  # read-only location; the array just isn't persisted
+
+def load_keyed_array(csv_path, path):
+    # None when missing or written for a different version of the CSV
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(csv_path)
+    stored = np.load(path, mmap_mode='r')
+    if len(stored) >= 2 and stored[0] == stat.st_size and stored[1] == stat.st_mtime_ns:
+        return stored[2:]
+    return None
+
+def load_row_index(csv_path, mm):
+    offsets = load_keyed_array(csv_path, row_index_path(csv_path))
+    if offsets is None:
+        offsets = scan_record_offsets(mm)
+        save_keyed_array(csv_path, row_index_path(csv_path), offsets)
+    return offsets
+
+def replace_csv(src, dst):
+    # os.replace for a CSV written by LazyFrame.to_csv: its row index moves with it.
+    # A rename keeps size and mtime, so the index stays valid for the new name.
+    os.replace(src, dst)
+    if os.path.exists(row_index_path(src)):
+        os.replace(row_index_path(src), row_index_path(dst))
+
+class _Indexer:
+    def __init__(self, frame):
+        self.frame = frame
+
+class _ILoc(_Indexer):
+    def __getitem__(self, i):
+        return self.frame.row(i)
+
+class _Loc(_Indexer):
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            rows, cols = key
+            if np.isscalar(rows):
+                return self.frame.row(rows)[cols]
+            return pd.DataFrame([self.frame.row(i) for i in rows], index=list(rows))[cols]
+        return self.frame.row(key)
+
+    def __setitem__(self, key, value):
+        rows, col = key
+        rows = [rows] if np.isscalar(rows) else list(rows)
+        values = [value] * len(rows) if np.isscalar(value) or value is None else list(value)
+        for i, v in zip(rows, values):
+            self.frame.set_value(i, col, v)
+
+class _At(_Indexer):
+    def __getitem__(self, key):
+        row, col = key
+        return self.frame.get_value(row, col)
+
+    def __setitem__(self, key, value):
+        row, col = key
+        self.frame.set_value(row, col, value)
+
+class LazyFrame:
+    def __init__(self, path, page_rows=PAGE_ROWS, cache_pages=CACHE_PAGES):
+        self.path = path
+        self.page_rows = page_rows
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = load_row_index(path, self._mm)
+        self._header = bytes(self._mm[:self._offsets[0]])
+        self.file_columns = next(csv.reader(io.StringIO(self._header.decode('utf-8'))))
+        self.columns = pd.Index(self.file_columns)
+        self.edits = {}          # row -> {column: value}
+        self.column_values = {}  # column -> value, for columns set wholesale (e.g. reset)
+        self._columns_cache = {}
+        self._page = functools.lru_cache(maxsize=cache_pages)(self._load_page)
+        self.dtypes = self._infer_dtypes()
+
+    def _infer_dtypes(self):
+        dtypes = self._load_page(0, infer=True).dtypes if len(self) else pd.Series(dtype=object)
+        schema = load_schema(self.path)
+        if schema:
+            # Categories are per page here, so categorical columns stay plain objects
+            for col, dtype in schema_dtypes(schema).items():
+                if col in dtypes.index and dtype != 'category':
+                    dtypes[col] = pd.api.types.pandas_dtype(dtype)
+        return dtypes.reindex(self.columns, fill_value=np.dtype(object))
+
+    def _load_page(self, page_no, infer=False):
+        start = page_no * self.page_rows
+        end = min(start + self.page_rows, len(self))
+        raw = self._mm[self._offsets[start]:self._offsets[end]]
+        page = pd.read_csv(io.BytesIO(raw), header=None, names=self.file_columns,
+                           dtype=None if infer else object)
+        page.index = range(start, end)
+        return page
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    @property
+    def empty(self):
+        return len(self) == 0 or len(self.columns) == 0
+
+    @property
+    def index(self):
+        return pd.RangeIndex(len(self))
+
+    @property
+    def iloc(self):
+        return _ILoc(self)
+
+    @property
+    def loc(self):
+        return _Loc(self)
+
+    @property
+    def at(self):
+        return _At(self)
+
+    def row(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError(f"row {i} out of range for {len(self)} rows")
+        row = self._page(i // self.page_rows).loc[i].reindex(self.columns)
+        for col, value in self.column_values.items():
+            row[col] = value
+        for col, value in self.edits.get(i, {}).items():
+            row[col] = value
+        return row
+
+    def get_value(self, i, col):
+        if col in self.edits.get(i, {}):
+            return self.edits[i][col]
+        return self.row(i)[col]
+
+    def set_value(self, i, col, value):
+        if col not in self.columns:
+            self[col] = None
+        self.edits.setdefault(i, {})[col] = value
+        self._columns_cache.pop(col, None)
+
+    def __contains__(self, col):
+        return col in self.columns
+
+    def __getitem__(self, col):
+        # Whole-column access reads just that column from the file, once per change
+        if col not in self._columns_cache:
+            if col in self.column_values:
+                series = pd.Series([self.column_values[col]] * len(self), dtype=object)
+            else:
+                series = pd.read_csv(self.path, usecols=[col])[col]
+            for i, row_edits in self.edits.items():
+                if col in row_edits:
+                    if series.dtype != object:
+                        series = series.astype(object)
+                    series.iat[i] = row_edits[col]
+            self._columns_cache[col] = series
+        return self._columns_cache[col]
+
+    def __setitem__(self, col, value):
+        # Only whole-column scalar assignment (adding 'reviewed', resetting it)
+        if not np.isscalar(value) and value is not None:
+            raise TypeError("LazyFrame only supports assigning a scalar to a whole column")
+        if col not in self.columns:
+            self.columns = self.columns.append(pd.Index([col]))
+            self.dtypes[col] = np.dtype(object)
+        self.column_values[col] = value
+        for row_edits in self.edits.values():
+            row_edits.pop(col, None)
+        self._columns_cache.pop(col, None)
+
+    def to_pandas(self):
+        df = pd.read_csv(self.path)
+        for col, value in self.column_values.items():
+            df[col] = value
+        for i, row_edits in self.edits.items():
+            for col, value in row_edits.items():
+                if df[col].dtype != object and not pd.api.types.is_scalar(value):
+                    df[col] = df[col].astype(object)
+                df.at[i, col] = value
+        return df
+
+    def eval(self, expr, **kwargs):
+        return self.to_pandas().eval(expr, **kwargs)
+
+    def copy(self, deep=True):
+        # Shares the mapped file and page cache; only the overlay is copied
+        clone = object.__new__(LazyFrame)
+        clone.__dict__.update(self.__dict__)
+        clone.columns = self.columns.copy()
+        clone.dtypes = self.dtypes.copy()
+        clone.edits = {i: dict(row_edits) for i, row_edits in self.edits.items()}
+        clone.column_values = dict(self.column_values)
+        clone._columns_cache = {}
+        return clone
+
+    def _page_with_overlay(self, page_no):
+        page = self._page(page_no).reindex(columns=self.columns)
+        for col, value in self.column_values.items():
+            page[col] = value
+        for i in range(page.index[0], page.index[-1] + 1):
+            for col, value in self.edits.get(i, {}).items():
+                page.at[i, col] = value
+        return page
+
+    def to_csv(self, path, index=False):
+        """
+        Unchanged pages are copied byte for byte; pages with edits are
+        re-encoded. The row index of the written file is known as it is
+        written, so it is saved alongside instead of being rescanned on the
+        next open.
+        """
+        rewrite_all = bool(self.column_values) or not self.columns.equals(pd.Index(self.file_columns))
+        dirty_pages = {i // self.page_rows for i in self.edits}
+        header = io.StringIO()
+        csv.writer(header, lineterminator='\n').writerow(list(self.columns))
+        starts = []
+        with open(path, 'wb') as out:
+            out.write(header.getvalue().encode('utf-8'))
+            for page_no in range((len(self) + self.page_rows - 1) // self.page_rows):
+                position = out.tell()
+                if rewrite_all or page_no in dirty_pages:
+                    text = self._page_with_overlay(page_no).to_csv(header=False, index=False, lineterminator='\n')
+                    raw = text.encode('utf-8')
+                    ends = record_ends(np.frombuffer(raw, dtype=np.uint8))
+                    starts.append(np.concatenate([[0], ends[:-1]]) + position)
+                else:
+                    start = page_no * self.page_rows
+                    end = min(start + self.page_rows, len(self))
+                    raw = self._mm[self._offsets[start]:self._offsets[end]]
+                    starts.append(self._offsets[start:end] - self._offsets[start] + position)
+                out.write(raw)
+            starts.append([out.tell()])
+        save_keyed_array(path, row_index_path(path), np.concatenate(starts))
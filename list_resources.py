@@ -1,7 +1,9 @@
 import requests
 import cssutils
 from bs4 import BeautifulSoup
+import argparse
 import json
+import os
 
 session = requests.Session()
 
@@ -131,14 +133,30 @@ def load_blacklist(file_path):
 def filter_records(data, blacklist):
     return [record for record in data if record['record_id'] not in blacklist]
 
-if __name__ == "__main__":
-    SEARCH_STR = "whitby stealing"
-    resources = search(SEARCH_STR)
+SEARCH_STR = "whitby stealing"
+BLACKLIST_FILE = 'data/id_blacklist.txt'
+OUTPUT_DIR = 'data'
+
+def list_resources(search_term, blacklist_file=BLACKLIST_FILE, output_dir=OUTPUT_DIR):
+    resources = search(search_term)
     print("Total matching resources:", len(resources))
-    
-    blacklist = load_blacklist('data/id_blacklist.txt')
+
+    blacklist = load_blacklist(blacklist_file)
     filtered_resources = filter_records(resources, blacklist)
     print("Resources remaining after cleaning:", len(filtered_resources))
-    
-    with open("data/" + SEARCH_STR + '.json', 'w') as f:
-        json.dump(filtered_resources, f, indent=4)
\ No newline at end of file
+
+    output_path = os.path.join(output_dir, search_term + '.json')
+    with open(output_path, 'w') as f:
+        json.dump(filtered_resources, f, indent=4)
+    return output_path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search the archive catalogue and save matching record links as JSON.")
+    parser.add_argument('--term', default=SEARCH_STR, help="Catalogue search term.")
+    parser.add_argument('--blacklist', default=BLACKLIST_FILE, help="File of record ids to drop, one per line.")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Directory for <term>.json.")
+    args = parser.parse_args(argv)
+    list_resources(args.term, args.blacklist, args.output_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+## python3 -m nrqs list --term "whitby stealing"
+## python3 -m nrqs fetch --input "data/whitby stealing.json" --output data/whitby.csv
+## python3 -m nrqs process --input data/whitby.csv --incremental
+## python3 -m nrqs run --term "whitby stealing" --term "scarborough stealing"
+## python3 -m nrqs review --file data/whitby_processed_20250611_232049.csv
+## python3 -m nrqs touchup data/whitby_processed_20250611_232049.csv --lazy
+## python3 -m nrqs bench --sizes 10000
+## python3 -m nrqs <command> --help
+##
+## One entry point for the pipeline stages and tools. The top level only
+## imports argparse and importlib; a subcommand's module (and with it pandas,
+## BeautifulSoup, spaCy or transformers) is imported only when that command
+## runs, and the remaining arguments are handed to the module's main(argv).
+
+import argparse
+import importlib
+import sys
+
+COMMANDS = {
+    'list': ('list_resources', "Search the archive catalogue and save matching record links (JSON)."),
+    'fetch': ('fetch_resources', "Fetch each listed record's catalogue page into a CSV."),
+    'process': ('process_resources', "Parse fetched records into the processed CSV."),
+    'run': ('pipeline_dag', "Run list, fetch and process per term, skipping up-to-date stages."),
+    'review': ('include_tool', "Mark processed rows as included/excluded, with edits."),
+    'touchup': ('touchup', "Browse, search and edit a CSV."),
+    'serve': ('parser_service', "Keep the parser warm for the tools' reparse command."),
+    'bench': ('bench_review', "Benchmark command latency of the review tools."),
+}
+
+def build_parser():
+    commands = "\n".join(f"  {name:<10}{summary}" for name, (_, summary) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog='nrqs',
+        description="North Riding quarter sessions pipeline and review tools.",
+        epilog=f"commands:\n{commands}\n\nRun 'nrqs <command> --help' for a command's options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('command', choices=COMMANDS, metavar='command', help="One of: " + ", ".join(COMMANDS))
+    return parser
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Only the command name is parsed here; everything after it belongs to the subcommand
+    args = build_parser().parse_args(argv[:1])
+    module = importlib.import_module(COMMANDS[args.command][0])
+    sys.argv[0] = f"nrqs {args.command}"  # so the subcommand's usage line reads 'nrqs review ...'
+    return module.main(argv[1:])
+
+if __name__ == "__main__":
+    main()
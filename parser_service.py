@@ -0,0 +1,118 @@
+## python3 -m parser_service    (keeps the parser warm on a Unix socket)
+##
+## include_tool and touchup use the client half (reparse_row) to refresh a
+## row's derived columns after its description is edited. The client side
+## must not import spaCy; the parser is only imported by serve().
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import pandas as pd
+from date_normaliser import parse_date_column
+from text_normaliser import normalise_description
+
+SOCKET_PATH = "/tmp/nrqs_parser.sock"
+CLIENT_TIMEOUT = 10
+
+CASE_FIELDS = ['offence', 'offence_location', 'court']
+DEFENDANT_FIELDS = ['surname', 'forenames', 'residence', 'occupation', 'gender']
+
+class ParserServiceError(Exception):
+    pass
+
+class ParseHandler(socketserver.StreamRequestHandler):
+    # One JSON request per line: {"description": "..."} -> {"case": {...} | null, "error": str | null}
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                case = self.server.parse(normalise_description(request['description']))
+                response = {'case': case.model_dump() if case else None, 'error': None}
+            except Exception as e:
+                response = {'case': None, 'error': str(e)}
+            self.wfile.write((json.dumps(response) + "\n").encode('utf-8'))
+            self.wfile.flush()
+
+def serve(socket_path=SOCKET_PATH):
+    from summary_conviction_parser import PIPELINE_VERSION, parse_normalised_conviction
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    with socketserver.UnixStreamServer(socket_path, ParseHandler) as server:
+        server.parse = parse_normalised_conviction
+        print(f"parser service (pipeline {PIPELINE_VERSION}) listening on {socket_path}")
+        try:
+            server.serve_forever()
+        finally:
+            os.remove(socket_path)
+
+def reparse(description, socket_path=SOCKET_PATH, timeout=CLIENT_TIMEOUT):
+    if not os.path.exists(socket_path):
+        raise ParserServiceError(f"parser service not running (start it with: python3 -m parser_service)")
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(socket_path)
+            client.sendall((json.dumps({'description': description}) + "\n").encode('utf-8'))
+            with client.makefile('r', encoding='utf-8') as reply:
+                response = json.loads(reply.readline())
+    except (OSError, ValueError) as e:
+        raise ParserServiceError(f"parser service error: {e}")
+    if response['error']:
+        raise ParserServiceError(f"parse failed: {response['error']}")
+    return response['case']
+
+def pick_defendant(row, defendants):
+    # A processed row holds one defendant; prefer the one with the row's surname
+    for defendant in defendants:
+        if defendant.get('surname') == row.get('surname'):
+            return defendant
+    return defendants[0] if defendants else {}
+
+def case_to_fields(row, case):
+    fields = {field: case.get(field) for field in CASE_FIELDS}
+    fields.update({field: pick_defendant(row, case.get('defendants') or []).get(field) for field in DEFENDANT_FIELDS})
+    fields['description_normalised'] = normalise_description(row['description'])
+
+    parts, _ = parse_date_column(pd.Series([case.get('date'), row.get('document_date')]))
+    for part in ['year', 'month', 'day']:
+        fields[part] = parts.at[0, part]
+        fields[f'document_{part}'] = parts.at[1, part]
+    offence_date, document_date = pd.to_datetime(parts.astype('float64'), errors='coerce')
+    fields['conviction_lag_days'] = (document_date - offence_date).days if pd.notna(offence_date) and pd.notna(document_date) else pd.NA
+    return fields
+
+def values_differ(old, new):
+    if pd.isna(old) and pd.isna(new):
+        return False
+    if pd.isna(old) or pd.isna(new):
+        return True
+    try:
+        return float(old) != float(new)  # 1888.0 read from CSV is the same year as 1888
+    except (TypeError, ValueError):
+        return str(old) != str(new)
+
+def reparse_row(row, socket_path=SOCKET_PATH):
+    """
+    Re-parse row['description'] through the running service and return
+    {column: new_value} for the row's derived columns whose value changed.
+    Raises ParserServiceError if the service is unavailable or parsing fails.
+    """
+    case = reparse(row['description'], socket_path)
+    if case is None:
+        raise ParserServiceError("parser found nothing in this description")
+    return {
+        column: value for column, value in case_to_fields(row, case).items()
+        if column in row.index and values_differ(row[column], value)
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve summary_conviction_parser over a Unix socket.")
+    parser.add_argument('--socket', default=SOCKET_PATH, help="Socket path.")
+    args = parser.parse_args(argv)
+    serve(args.socket)
+
+if __name__ == "__main__":
+    main()
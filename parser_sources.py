@@ -0,0 +1,17 @@
+"""
+parser_sources.py - The files that decide process_resources' parsed output.
+
+process_resources hashes them into the parser fingerprint of its manifest, and
+pipeline_dag into the process stage's fingerprint. They live here rather than
+in process_resources so pipeline_dag can read them without importing spaCy.
+"""
+
+from gender_lookup import GENDER_OVERRIDES_FILE, GENDER_TABLE_FILE
+
+# Code and lookup data that decide the parsed output besides the descriptions.
+# PIPELINE_VERSION already covers spaCy, the base model and the gazetteers.
+PARSER_CODE = [
+    'process_resources.py', 'summary_conviction_parser.py', 'conviction_pipeline.py', 'data_models.py',
+    'data_schema.py', 'date_normaliser.py', 'text_normaliser.py', 'gender_lookup.py', 'summary2.py',
+]
+PARSER_DATA = [GENDER_TABLE_FILE, GENDER_OVERRIDES_FILE]
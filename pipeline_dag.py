@@ -0,0 +1,250 @@
+## python3 -m nrqs run --term "whitby stealing"
+## python3 -m nrqs run --term "whitby stealing" --term "scarborough stealing" --jobs 2
+## python3 -m nrqs run --term "whitby stealing" --force list     (re-query the catalogue)
+##
+## Runs list -> fetch -> process as a DAG, one chain per search term. Each stage
+## is fingerprinted from its command line (parameters), the source of the
+## modules it runs (code version) and the content of its input files. A stage
+## is skipped when its fingerprint matches the last run and its outputs are
+## unchanged on disk. Because fingerprints use output content rather than
+## timestamps, a re-run upstream stage that produces identical output does not
+## invalidate anything downstream. Independent stages (different terms) run
+## concurrently, each in its own `python -m nrqs` subprocess with its log under
+## cache/logs/. When a stage's code or lookup data changed, its incremental
+## flag is dropped for that run so its previous output is not reused.
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from parser_sources import PARSER_CODE, PARSER_DATA
+
+STATE_FILE = "cache/pipeline_state.json"
+LOG_DIR = "cache/logs"
+DATA_DIR = "data"
+
+LIST_CODE = ['list_resources.py']
+FETCH_CODE = ['fetch_resources.py']
+# The parser's own fingerprint inputs, plus the doc cache the stage also runs
+PROCESS_CODE = PARSER_CODE + ['doc_cache.py']
+# Data the parser reads besides its input; the snapshot meta carries the spaCy/model versions
+PROCESS_DATA = PARSER_DATA + ['data/person_names.txt', 'models/conviction_pipeline/meta.json']
+
+class Stage:
+    def __init__(self, name, command, inputs=(), outputs=(), code=(), data=(), deps=(), incremental_flag=None):
+        self.name = name
+        self.command = list(command)  # nrqs arguments
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+        self.data = list(data)  # lookup data read alongside the inputs; treated like code
+        self.deps = list(deps)
+        self.incremental_flag = incremental_flag  # dropped from command when code or data changed
+
+def file_hash(path):
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def hash_json(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+
+def code_hash(stage):
+    return hash_json({path: file_hash(path) for path in stage.code + stage.data})
+
+def fingerprint(stage):
+    return hash_json({
+        'command': stage.command,
+        'code': code_hash(stage),
+        'inputs': {path: file_hash(path) for path in stage.inputs},
+    })
+
+def slug(term):
+    return re.sub(r'[^a-z0-9]+', '_', term.lower()).strip('_')
+
+def term_stages(term, incremental=True, workers=None):
+    """The list -> fetch -> process chain for one catalogue search term."""
+    links = os.path.join(DATA_DIR, term + '.json')  # list_resources names its output after the term
+    fetched = os.path.join(DATA_DIR, slug(term) + '.csv')
+    processed = os.path.join(DATA_DIR, slug(term) + '_processed.csv')
+    process_command = ['process', '--input', fetched, '--output', processed]
+    if incremental:
+        process_command.append('--incremental')
+    if workers:
+        process_command += ['--workers', str(workers)]
+    return [
+        Stage(f"list:{term}", ['list', '--term', term, '--output-dir', DATA_DIR],
+              inputs=['data/id_blacklist.txt'], outputs=[links], code=LIST_CODE),
+        Stage(f"fetch:{term}", ['fetch', '--input', links, '--output', fetched],
+              inputs=[links], outputs=[fetched], code=FETCH_CODE, deps=[f"list:{term}"]),
+        Stage(f"process:{term}", process_command, inputs=[fetched], outputs=[processed],
+              code=PROCESS_CODE, data=PROCESS_DATA, deps=[f"fetch:{term}"], incremental_flag='--incremental'),
+    ]
+
+def load_state(path=STATE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def save_state(state, path=STATE_FILE):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f, indent=4)
+    os.replace(path + '.tmp', path)
+
+def is_fresh(stage, fp, state):
+    entry = state.get(stage.name)
+    return bool(entry) and entry['fingerprint'] == fp and all(
+        file_hash(path) is not None and file_hash(path) == entry['outputs'].get(path) for path in stage.outputs
+    )
+
+def run_subprocess(stage, command):
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, slug(stage.name) + '.log')
+    with open(log_path, 'w') as log:
+        result = subprocess.run([sys.executable, '-m', 'nrqs'] + command, stdout=log, stderr=subprocess.STDOUT)
+    if result.returncode != 0:
+        raise RuntimeError(f"exited with {result.returncode}, see {log_path}")
+
+def forced(stage, force):
+    # --force matches a whole stage name ('list:whitby stealing') or a stage kind ('list')
+    return stage.name in force or stage.name.split(':', 1)[0] in force
+
+def run_dag(stages, jobs=1, force=(), state_path=STATE_FILE, runner=run_subprocess):
+    """
+    Run stages in dependency order, up to `jobs` at a time. Returns
+    {stage name: 'cached' | 'ran' | 'failed: <reason>' | 'blocked'}.
+    """
+    state = load_state(state_path)
+    lock = threading.Lock()
+    results = {}
+
+    def run_stage(stage):
+        fp = fingerprint(stage)
+        code = code_hash(stage)
+        with lock:
+            fresh = is_fresh(stage, fp, state)
+            previous_code = state.get(stage.name, {}).get('code')
+        if fresh and not forced(stage, force):
+            return 'cached'
+        command = stage.command
+        if stage.incremental_flag and previous_code != code:
+            # Output from older code (or from an unknown run) must not be merged into
+            command = [arg for arg in command if arg != stage.incremental_flag]
+        print(f"running {stage.name}: nrqs {' '.join(command)}")
+        runner(stage, command)
+        missing = [path for path in stage.outputs if not os.path.exists(path)]
+        if missing:
+            raise RuntimeError(f"did not write {', '.join(missing)}")
+        with lock:
+            state[stage.name] = {
+                'fingerprint': fp, 'code': code,
+                'outputs': {path: file_hash(path) for path in stage.outputs},
+            }
+            save_state(state, state_path)
+        return 'ran'
+
+    pending = {stage.name: stage for stage in stages}
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if any(results.get(dep, 'ok') not in ('cached', 'ran', 'ok') for dep in stage.deps):
+                    results[name] = 'blocked'
+                    del pending[name]
+                elif all(results.get(dep) in ('cached', 'ran') for dep in stage.deps):
+                    running[pool.submit(run_stage, stage)] = name
+                    del pending[name]
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    results[name] = f"failed: {e}"
+                print(f"{name}: {results[name]}")
+    for name in pending:
+        results[name] = 'blocked'
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run list -> fetch -> process, skipping stages whose inputs haven't changed.")
+    parser.add_argument('--term', action='append', required=True,
+                        help="Catalogue search term, e.g. 'whitby stealing'. Repeat for more towns.")
+    parser.add_argument('--jobs', type=int, default=2, help="Stages to run at once.")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Parser worker processes per process stage (default: all CPUs).")
+    parser.add_argument('--full', action='store_true', help="Re-parse everything rather than --incremental.")
+    parser.add_argument('--force', action='append', default=[],
+                        help="Re-run a stage even if cached: a kind (list, fetch, process) or a full name "
+                             "like 'list:whitby stealing'. The catalogue is only re-queried with --force list.")
+    args = parser.parse_args(argv)
+
+    stages = [stage for term in args.term for stage in term_stages(term, not args.full, args.workers)]
+    results = run_dag(stages, jobs=args.jobs, force=set(args.force))
+    print()
+    for stage in stages:
+        print(f"{stage.name:<40}{results[stage.name]}")
+    if any(status.startswith('failed') or status == 'blocked' for status in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
+
+########################
+# Tests below here
+########################
+
+def test_run_dag_caches_blocks_and_drops_incremental(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    with open('b_code.py', 'w') as f:
+        f.write("VERSION = 1\n")
+    stages = [
+        Stage('a', ['a'], outputs=['a.txt']),
+        Stage('b', ['b', '--incremental'], inputs=['a.txt'], outputs=['b.txt'], code=['b_code.py'],
+              deps=['a'], incremental_flag='--incremental'),
+        Stage('broken', ['broken'], outputs=['broken.txt']),
+        Stage('c', ['c'], inputs=['broken.txt'], outputs=['c.txt'], deps=['broken']),
+    ]
+    commands = []
+    def fake_runner(stage, command):
+        commands.append(command)
+        if stage.name == 'broken':
+            raise RuntimeError("exited with 1")
+        with open(stage.outputs[0], 'w') as f:
+            f.write(stage.name)
+
+    # A bare file name as the state path has no folder to create
+    results = run_dag(stages, state_path='state.json', runner=fake_runner)
+    assert results == {'a': 'ran', 'b': 'ran', 'broken': 'failed: exited with 1', 'c': 'blocked'}
+    assert ['b'] in commands  # no earlier run whose output --incremental could reuse
+
+    commands.clear()
+    results = run_dag(stages, state_path='state.json', runner=fake_runner)
+    assert results['a'] == results['b'] == 'cached' and results['c'] == 'blocked'
+    assert commands == [['broken']]
+
+    commands.clear()
+    results = run_dag(stages, force={'b'}, state_path='state.json', runner=fake_runner)
+    assert results['b'] == 'ran' and ['b', '--incremental'] in commands
+
+    with open('b_code.py', 'w') as f:
+        f.write("VERSION = 2\n")
+    commands.clear()
+    results = run_dag(stages, state_path='state.json', runner=fake_runner)
+    assert results['a'] == 'cached' and results['b'] == 'ran'
+    assert ['b'] in commands  # code changed, so the previous output must not be merged into
@@ -1,13 +1,29 @@
 import pandas as pd
+import argparse
+import hashlib
+import json
 import os
+import re
+import sys
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from summary_conviction_parser import parse_conviction
+from itertools import repeat
+from summary_conviction_parser import PIPELINE_VERSION, nlp_processor, parse_normalised_conviction, use_doc_cache
+from data_models import Case, Person
+from data_schema import apply_categorical_columns, read_csv_with_schema, save_csv_with_schema
+from date_normaliser import format_iso_date, normalise_dates
+from text_normaliser import normalise_descriptions, text_hash
+from doc_cache import DocCache
+from gender_lookup import load_gender_table, lookup_gender
+from parser_sources import PARSER_CODE, PARSER_DATA
 # from indictment_processor import process_indictment
 
 INPUT_FILE = "data/whitby.csv"
 
 ROW_PARSERS = {
-    'Summary conviction': parse_conviction,
+    'Summary conviction': parse_normalised_conviction,
     # 'Bill of indictment': process_indictment
 }
 
@@ -15,7 +31,7 @@ def load_data(path):
     return pd.read_csv(path)
 
 def save_data(df, path):
-    df.to_csv(path, index=False)
+    save_csv_with_schema(df, path)
 
 def filter_rows_by_prefix(df, prefixes):
     prefixes = tuple(prefixes)
@@ -34,47 +50,162 @@ def subset_data(df, prefixes, start=None, end=None):
     df.reset_index(drop=True, inplace=True)
     return df
 
-def process_dataframe(df, start=None, end=None):
+def record_type_pattern(prefixes):
+    # One anchored alternation, tried in ROW_PARSERS order, like the old startswith loop
+    return '^(' + '|'.join(re.escape(prefix) for prefix in prefixes) + ')'
+
+def classify_titles(df, prefixes):
+    return df['title'].astype(str).str.extract(record_type_pattern(prefixes), expand=False)
+
+def init_worker():
+    # Workers forked after this module was imported already share the parent's
+    # spaCy pipeline and forename table; this only matters for spawned workers.
+    load_gender_table()
+
+def run_parser(func, text):
+    # Exceptions are returned rather than raised so one bad record doesn't abort its batch
+    try:
+        return func(text).model_dump(), None  # Pydantic v2 method
+    except Exception as e:
+        return None, str(e)
+
+def submit_batch(func, texts, workers):
+    """
+    Start parsing texts with func. Each record type gets its own process pool
+    (or runs inline when workers <= 1); returns (pool, results iterator).
+    """
+    if workers <= 1:
+        return None, (run_parser(func, text) for text in texts)
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+    chunksize = max(1, len(texts) // (workers * 4))
+    return pool, pool.map(run_parser, repeat(func, len(texts)), texts, chunksize=chunksize)
+
+def print_parse_stats(stats):
+    print(f"{'record type':<24}{'rows':>8}{'parsed':>8}{'errors':>8}{'seconds':>10}{'rows/s':>10}")
+    for record_type, s in stats.items():
+        rate = s['rows'] / s['seconds'] if s['seconds'] else float('inf')
+        print(f"{record_type:<24}{s['rows']:>8}{s['parsed']:>8}{s['errors']:>8}{s['seconds']:>10.2f}{rate:>10.1f}")
+
+def needs_ner_tier(df):
+    missing_defendants = df['defendants'].map(lambda defendants: not defendants)
+    incomplete = missing_defendants | df['date'].isna() | df['offence_location'].isna()
+    # Rows with no description were already counted as errors; there is nothing to send
+    return incomplete & df['description_normalised'].notna()
+
+def defendant_from_entity(name):
+    parts = name.split()
+    if len(parts) < 2:
+        return None
+    forenames = " ".join(parts[:-1])
+    return Person(forenames=forenames, surname=parts[-1], gender=lookup_gender(parts[0])).model_dump()
+
+def fill_from_entities(df, idx, entities):
+    # Only fill what the rule-based tier left empty; returns True if anything was filled
+    filled = False
+    if not df.at[idx, 'defendants']:
+        defendants = [d for d in map(defendant_from_entity, entities['persons']) if d]
+        if defendants:
+            df.at[idx, 'defendants'] = defendants
+            filled = True
+    if pd.isna(df.at[idx, 'date']) and entities['dates']:
+        date = format_iso_date(entities['dates'][0].split())
+        if date:
+            df.at[idx, 'date'] = date
+            filled = True
+    if pd.isna(df.at[idx, 'offence_location']) and entities['locations']:
+        df.at[idx, 'offence_location'] = entities['locations'][0]
+        filled = True
+    return filled
+
+def cascade_to_ner(df, batch_size=16, backend="pytorch"):
+    """
+    Second tier: send only rows the rule-based parser left without
+    defendants, date or offence location to the transformer NER in summary2,
+    in batches. Returns (rows sent, rows improved, seconds).
+    """
+    mask = needs_ner_tier(df)
+    if not mask.any():
+        return 0, 0, 0.0
+
+    # transformers is only imported when there is something for this tier to do
+    from summary2 import extract_entities_batch
+
+    started = time.perf_counter()
+    rows = df[mask]
+    entities = extract_entities_batch(rows['description_normalised'].tolist(), batch_size=batch_size, backend=backend)
+    improved = sum(fill_from_entities(df, idx, ents) for idx, ents in zip(rows.index, entities))
+    return int(mask.sum()), improved, time.perf_counter() - started
+
+def print_tier_stats(stats, ner_tier):
+    rule_rows = sum(s['rows'] for s in stats.values())
+    rule_seconds = sum(s['seconds'] for s in stats.values())
+    sent, improved, seconds = ner_tier
+    print(f"{'tier':<24}{'rows':>8}{'improved':>10}{'seconds':>10}")
+    print(f"{'rule-based (spaCy)':<24}{rule_rows:>8}{'':>10}{rule_seconds:>10.2f}")
+    print(f"{'transformer NER':<24}{sent:>8}{improved:>10}{seconds:>10.2f}")
+
+def normalise_records(df):
+    # The rows we have parsers for, normalised once; the hashes and the parse both reuse the column
+    df = subset_data(df, ROW_PARSERS.keys())
+    df['description_normalised'] = normalise_descriptions(df['description'])
+    return df
+
+def process_dataframe(df, start=None, end=None, workers=1, tiered=False, ner_backend="pytorch"):
     df = df.copy()
     df = subset_data(df, ROW_PARSERS.keys(), start, end)
- 
-    total_rows = len(df)
-    error_count = 0
-
-    for idx, row in df.iterrows():
-        print(f'Working: {idx + 1} of {total_rows}')
-        try:
-            for prefix, func in ROW_PARSERS.items():
-                if row['title'].startswith(prefix):
-                    pydantic_obj = func(row['description'])
-                    dumped = pydantic_obj.model_dump()  # Pydantic v2 method
-
-                    for k, v in dumped.items():
-                        df.at[idx, k] = v
-                    # df.at[idx, "idx"] = idx
-                    break  # assuming one match per row
-        except Exception as e:
-            print(f'Error processing row {idx + 1} (title="{row["title"]}"): {e}')
-            error_count += 1
-
-    df = split_date_column(df)
-
-    print(f'Processing complete. Total errors: {error_count}')
-    return df
+    if 'description_normalised' not in df.columns:
+        df['description_normalised'] = normalise_descriptions(df['description'])
+    df['record_type'] = classify_titles(df, ROW_PARSERS.keys())
+
+    parsed = pd.Series([None] * len(df), index=df.index, dtype=object)
+    stats = {}
+    batches = {}
+
+    # Dispatch every record type at once; duplicate normalised descriptions are parsed once
+    for record_type, group in df.groupby('record_type', sort=False):
+        # Rows without a description are errors; they are reported rather than sent to the parser
+        missing = group.index[group['description_normalised'].isna()]
+        for idx in missing:
+            print(f'Error processing row {idx + 1} (title="{df.at[idx, "title"]}"): no description')
+        texts = list(group['description_normalised'].dropna().unique())
+        print(f'Working: {len(texts)} {record_type} descriptions ({len(group)} rows)')
+        started = time.perf_counter()
+        pool, results = submit_batch(ROW_PARSERS[record_type], texts, workers)
+        batches[record_type] = (group, texts, len(missing), pool, results, started)
+
+    for record_type, (group, texts, missing, pool, results, started) in batches.items():
+        by_text = {}
+        errors = missing
+        for text, (dumped, error) in zip(texts, results):
+            if error:
+                first_idx = group.index[group['description_normalised'] == text][0]
+                print(f'Error processing row {first_idx + 1} (title="{df.at[first_idx, "title"]}"): {error}')
+                errors += group['description_normalised'].eq(text).sum()
+            by_text[text] = dumped
+        if pool:
+            pool.shutdown()
+        parsed[group.index] = group['description_normalised'].map(by_text.get)
+        stats[record_type] = {
+            'rows': len(group), 'parsed': len(texts), 'errors': int(errors),
+            'seconds': time.perf_counter() - started,
+        }
+
+    for field in Case.model_fields:
+        df[field] = parsed.map(lambda dumped: dumped.get(field) if dumped else None)
+    df = df.drop(columns=['record_type'])
 
+    if tiered:
+        ner_tier = cascade_to_ner(df, backend=ner_backend)
 
-def split_date_column(df):
-    # Ensure the 'date' column is in datetime format
-    df['date'] = pd.to_datetime(df['date'], errors='coerce')
-    
-    # Extract year, month, and day into new columns
-    df['year'] = df['date'].dt.year
-    df['month'] = df['date'].dt.month
-    df['day'] = df['date'].dt.day
-    
-    # Drop the original 'date' column
-    df = df.drop(columns=['date'])
-    
+    df, date_failures = normalise_dates(df)
+    # Categorise case-level columns before explode_defendants copies them per defendant
+    df = apply_categorical_columns(df)
+
+    print_parse_stats(stats)
+    if tiered:
+        print_tier_stats(stats, ner_tier)
+    print(f'Processing complete. Total errors: {sum(s["errors"] for s in stats.values())}')
+    print('Date parse failures: ' + ', '.join(f'{col}={n}' for col, n in date_failures.items()))
     return df
 
 def get_description(df, row_num):
@@ -95,26 +226,177 @@ def explode_defendants(df):
     df_exploded = df_exploded.drop(columns=['defendants']).reset_index(drop=True)
     result_df = pd.concat([df_exploded, defendants_df], axis=1)
 
-    return result_df
+    return apply_categorical_columns(result_df)
 
-## python3 -m process_resources        
-if __name__ == "__main__":
-    df = load_data(INPUT_FILE)
+def manifest_path_for(input_file):
+    base = os.path.splitext(os.path.basename(input_file))[0]
+    return os.path.join(os.path.dirname(input_file), f"{base}_manifest.json")
 
-    #debug_parse_conviction_row(df, 2)
+def load_manifest(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
 
-    #processed_df = process_dataframe(df,1,2)
-    #processed_df = process_dataframe(df,6000,7000)
-    processed_df = process_dataframe(df)
-    processed_df = explode_defendants(processed_df)
-    print(processed_df)
+def save_manifest(path, output_path, hashes, parser):
+    with open(path, 'w') as f:
+        json.dump({'output': output_path, 'parser': parser, 'records': hashes}, f, indent=4)
+
+def parser_fingerprint(options):
+    # Records parsed under a different fingerprint can't be reused by --incremental
+    digest = hashlib.sha1(PIPELINE_VERSION.encode('utf-8'))
+    digest.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+    folder = os.path.dirname(os.path.abspath(__file__))
+    for path in [os.path.join(folder, name) for name in PARSER_CODE] + PARSER_DATA:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+def description_hashes(df):
+    # record_id -> hash of the normalised description(s) for every row we would parse;
+    # df is the output of normalise_records
+    hashes = {}
+    for record_id, group in df.groupby('record_id', sort=False):
+        hashes[record_id] = text_hash("\n".join(group['description_normalised'].fillna('')))
+    return hashes
+
+def process_incremental(df, manifest, hashes, workers=1, tiered=False, ner_backend="pytorch"):
+    """
+    Parse only records that are new or whose normalised description changed
+    since the manifest was written, and merge them into the previous output.
+    Returns the merged frame, or None when nothing has changed.
+    """
+    previous_hashes = manifest['records']
+    changed = {record_id for record_id, h in hashes.items() if previous_hashes.get(record_id) != h}
+    removed = set(previous_hashes) - set(hashes)
+    print(f'Incremental: {len(changed)} new or changed records, {len(removed)} removed, '
+          f'{len(hashes) - len(changed)} reused from {manifest["output"]}')
+    if not changed and not removed:
+        return None
+
+    previous = read_csv_with_schema(manifest['output'])
+    kept = previous[~previous['record_id'].isin(changed | removed)]
+
+    frames = [kept]
+    if changed:
+        changed_rows = df[df['record_id'].isin(changed)]
+        frames.append(explode_defendants(process_dataframe(changed_rows, workers=workers, tiered=tiered, ner_backend=ner_backend)))
+    merged = pd.concat(frames, ignore_index=True)
+
+    # Keep records in input order, as a full run would
+    order = {record_id: i for i, record_id in enumerate(hashes)}
+    merged = merged.sort_values('record_id', key=lambda ids: ids.map(order), kind='stable', ignore_index=True)
+    return apply_categorical_columns(merged)
 
+## python3 -m process_resources
+## python3 -m process_resources --incremental
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse fetched records into the processed CSV.")
+    parser.add_argument('--input', default=INPUT_FILE, help="CSV written by fetch_resources.")
+    parser.add_argument('--output', default=None,
+                        help="CSV to write (default: <input>_processed_<timestamp>.csv next to the input).")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only parse new or changed records and merge them into the last output.")
+    parser.add_argument('--tiered', action='store_true',
+                        help="Send records the rule-based parser couldn't fully parse to the transformer NER.")
+    parser.add_argument('--ner-backend', default='pytorch', choices=('pytorch', 'int8', 'onnx'),
+                        help="Inference backend for the --tiered NER tier.")
+    parser.add_argument('--doc-cache', action='store_true',
+                        help="Reuse cached spaCy Docs (cache/) and add new ones; parses inline.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Worker processes per record type (1 parses inline).")
+    args = parser.parse_args(argv)
+    input_file = args.input
 
+    print(f'spaCy pipeline version {PIPELINE_VERSION}')
+    doc_cache = None
+    if args.doc_cache:
+        # The cache lives in this process, so parsing runs inline rather than in worker pools
+        doc_cache = DocCache(nlp_processor.vocab, PIPELINE_VERSION)
+        use_doc_cache(doc_cache)
+        args.workers = 1
+        print(f'{len(doc_cache)} cached docs in {doc_cache.path}')
+    df = normalise_records(load_data(input_file))
+    load_gender_table()  # before any worker pool forks, so workers share it
+    manifest_path = manifest_path_for(input_file)
+    manifest = load_manifest(manifest_path)
+    hashes = description_hashes(df)
+    # --tiered changes which fields get filled, so a run with different options is a different parse
+    parser = parser_fingerprint({'tiered': args.tiered, 'ner_backend': args.ner_backend if args.tiered else None})
 
-    base = os.path.splitext(os.path.basename(INPUT_FILE))[0]
-    folder = os.path.dirname(INPUT_FILE)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = os.path.join(folder, f"{base}_processed_{timestamp}.csv")
+    #debug_parse_conviction_row(df, 2)
+
+    parser_changed = manifest is not None and manifest.get('parser') != parser
+    if args.incremental and manifest and not parser_changed and os.path.exists(manifest['output']):
+        processed_df = process_incremental(df, manifest, hashes, workers=args.workers,
+                                           tiered=args.tiered, ner_backend=args.ner_backend)
+        if processed_df is None:
+            print(f"{manifest['output']} is up to date")
+            if args.output in (None, manifest['output']):
+                return manifest['output']
+            processed_df = read_csv_with_schema(manifest['output'])
+    else:
+        if args.incremental and parser_changed:
+            print('Parser code, data or options changed since the last run, running a full parse')
+        elif args.incremental:
+            print('No previous output in manifest, running a full parse')
+        #processed_df = process_dataframe(df,1,2)
+        #processed_df = process_dataframe(df,6000,7000)
+        processed_df = process_dataframe(df, workers=args.workers, tiered=args.tiered, ner_backend=args.ner_backend)
+        processed_df = explode_defendants(processed_df)
+    print(processed_df)
 
+    output_path = args.output
+    if output_path is None:
+        base = os.path.splitext(os.path.basename(input_file))[0]
+        folder = os.path.dirname(input_file)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = os.path.join(folder, f"{base}_processed_{timestamp}.csv")
+
+    if doc_cache is not None:
+        doc_cache.save()
     save_data(processed_df, output_path)
+    save_manifest(manifest_path, output_path, hashes, parser)
     print(f"wrote {output_path}")
+    return output_path
+
+if __name__ == "__main__":
+    main()
+
+
+########################
+# Tests below here
+########################
+
+def test_missing_description_is_a_row_error(monkeypatch, capsys):
+    monkeypatch.setitem(ROW_PARSERS, 'Summary conviction', lambda text: Case(offence=text))
+    df = pd.DataFrame({
+        'record_id': ['A', 'B', 'C'],
+        'title': ['Summary conviction of A', 'Summary conviction of B', 'Summary conviction of C'],
+        'description': ['Stealing a duck', None, 'Stealing a duck'],
+    })
+    processed = process_dataframe(df)
+    assert processed['offence'].tolist()[::2] == ['Stealing a duck', 'Stealing a duck']
+    assert pd.isna(processed.at[1, 'offence'])
+    out = capsys.readouterr().out
+    assert 'Error processing row 2 (title="Summary conviction of B"): no description' in out
+    assert 'Total errors: 1' in out
+
+def test_tiered_skips_missing_descriptions(monkeypatch, capsys):
+    monkeypatch.setitem(ROW_PARSERS, 'Summary conviction', lambda text: Case(offence=text))
+    sent = []
+    def extract_entities_batch(texts, batch_size=16, backend="pytorch"):
+        sent.extend(texts)
+        return [{'persons': ['Mary Smith'], 'dates': [], 'locations': []} for _ in texts]
+    monkeypatch.setitem(sys.modules, 'summary2', types.SimpleNamespace(extract_entities_batch=extract_entities_batch))
+    df = pd.DataFrame({
+        'record_id': ['A', 'B'],
+        'title': ['Summary conviction of A', 'Summary conviction of B'],
+        'description': ['Stealing a duck', None],
+    })
+    processed = process_dataframe(df, tiered=True)
+    assert sent == ['Stealing a duck']
+    assert processed.at[0, 'defendants'][0]['surname'] == 'Smith'
+    assert not processed.at[1, 'defendants']
+    assert 'Total errors: 1' in capsys.readouterr().out
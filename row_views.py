@@ -0,0 +1,71 @@
+"""
+row_views.py - Sort and filter views for touchup's navigation.
+
+A view is an array of base-frame row positions. A sort is a stable
+permutation; a filter is the positions where a pandas expression holds; a
+sorted filter is the permutation restricted to the filter. Arrays are cached
+per (filter, sort) spec, so switching between views is a dictionary lookup and
+the frame itself is never copied or reordered. A cached array is dropped when
+a column it depends on is edited.
+"""
+
+import re
+import numpy as np
+import pandas as pd
+from data_schema import evaluate_predicate
+
+def sort_order(series, descending=False):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Categoricals sort by category code, and set_cell appends new categories last
+        series = series.astype(object)
+    try:
+        ordered = series.sort_values(ascending=not descending, kind='mergesort', na_position='last')
+    except TypeError:
+        # Mixed types (e.g. text typed into a numeric column): order as text
+        ordered = series.astype(str).where(series.notna()).sort_values(
+            ascending=not descending, kind='mergesort', na_position='last')
+    return ordered.index.to_numpy()
+
+def filter_rows(df, expression):
+    return np.flatnonzero(evaluate_predicate(df, expression).to_numpy())
+
+def describe(filter_expr, sort):
+    parts = []
+    if filter_expr:
+        parts.append(f"filter {filter_expr}")
+    if sort:
+        parts.append(f"sort {sort[0]}{' desc' if sort[1] else ''}")
+    return ", ".join(parts)
+
+class ViewCache:
+    def __init__(self, df):
+        self.df = df
+        self.arrays = {}
+        self.depends = {}
+
+    def columns_in(self, expression):
+        return {col for col in self.df.columns if re.search(rf'(?<!\w){re.escape(col)}(?!\w)', expression)}
+
+    def rows(self, filter_expr=None, sort=None):
+        """
+        Row positions for a view; sort is (column, descending) or None.
+        Raises whatever evaluating the filter raises.
+        """
+        key = (filter_expr, sort)
+        if key not in self.arrays:
+            if filter_expr and sort:
+                order = self.rows(sort=sort)
+                array = order[np.isin(order, self.rows(filter_expr=filter_expr))]
+                depends = self.depends[(None, sort)] | self.depends[(filter_expr, None)]
+            elif sort:
+                array, depends = sort_order(self.df[sort[0]], sort[1]), {sort[0]}
+            else:
+                array, depends = filter_rows(self.df, filter_expr), self.columns_in(filter_expr)
+            self.arrays[key] = array
+            self.depends[key] = depends
+        return self.arrays[key]
+
+    def invalidate(self, column_name):
+        for key in [key for key, columns in self.depends.items() if column_name in columns]:
+            del self.arrays[key]
+            del self.depends[key]
@@ -0,0 +1,113 @@
+"""
+screen.py - Diff-redraw terminal output for touchup and include_tool.
+
+Screen.render(lines) paints a frame at the top of the terminal with ANSI
+escapes and remembers it; the next render only rewrites the lines that
+changed, then clears whatever was printed below the frame (status messages,
+prompts). clear() is an escape sequence rather than a `clear` subprocess.
+
+When stdout is not a terminal (pipes, pytest's capsys) frames are printed in
+full with no escapes. When the frame plus RESERVED_LINES does not fit the
+terminal, every frame is a full repaint, since scrolling would invalidate the
+remembered positions. RESERVED_LINES only covers the prompt and a status line
+or two: callers invalidate() after printing anything longer below the frame
+(listings, previews, help), and `frames` counts renders so a command loop can
+tell when a command printed without redrawing.
+
+read_keys() supports single-key navigation: it blocks for one keypress and
+then drains whatever else is queued, so key repeat collapses into one redraw.
+"""
+
+import os
+import re
+import shutil
+import sys
+import unicodedata
+
+CLEAR = '\x1b[2J\x1b[H'
+CLEAR_LINE = '\x1b[2K'
+CLEAR_BELOW = '\x1b[J'
+ANSI_PATTERN = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+RESERVED_LINES = 8
+
+ARROW_KEYS = {'\x1b[A': 'up', '\x1b[B': 'down', '\x1b[C': 'right', '\x1b[D': 'left'}
+
+def move_to(row):
+    return f'\x1b[{row};1H'
+
+def visible_width(text):
+    text = ANSI_PATTERN.sub('', text)
+    return sum(2 if unicodedata.east_asian_width(ch) in ('W', 'F') else 1 for ch in text)
+
+class Screen:
+    def __init__(self, out=None):
+        self.out = out
+        self.lines = None
+        self.frames = 0
+
+    @property
+    def stream(self):
+        # Resolved per call so redirected/captured stdout is honoured
+        return self.out or sys.stdout
+
+    def invalidate(self):
+        self.lines = None
+
+    def clear(self):
+        if self.stream.isatty():
+            self.stream.write(CLEAR)
+            self.stream.flush()
+        self.invalidate()
+
+    def render(self, lines):
+        """
+        Draw lines (which may carry colour codes) as the current frame and
+        leave the cursor just below it.
+        """
+        lines = [part for line in lines for part in str(line).split('\n')]
+        out = self.stream
+        self.frames += 1
+        if not out.isatty():
+            out.write('\n'.join(lines) + '\n')
+            return
+        width, height = shutil.get_terminal_size()
+        heights = [max(1, -(-visible_width(line) // width)) for line in lines]
+        if self.lines is None or sum(heights) + RESERVED_LINES > height:
+            out.write(CLEAR + '\n'.join(lines) + '\n')
+        else:
+            parts = []
+            row = 1
+            for i, line in enumerate(lines):
+                old = self.lines[i] if i < len(self.lines) else None
+                if old is None or self.heights[i] != heights[i]:
+                    # Line count shifted: everything from here down moves
+                    parts.append(move_to(row) + CLEAR_BELOW + '\n'.join(lines[i:]) + '\n')
+                    row += sum(heights[i:])
+                    break
+                if old != line:
+                    parts.append(''.join(move_to(row + k) + CLEAR_LINE for k in range(heights[i])))
+                    parts.append(move_to(row) + line)
+                row += heights[i]
+            parts.append(move_to(row) + CLEAR_BELOW)
+            out.write(''.join(parts))
+        out.flush()
+        self.lines = lines
+        self.heights = heights
+
+def parse_keys(data):
+    # Raw terminal bytes -> key names: arrows by name, other keys as typed
+    keys = []
+    i = 0
+    while i < len(data):
+        sequence = data[i:i + 3]
+        if sequence in ARROW_KEYS:
+            keys.append(ARROW_KEYS[sequence])
+            i += 3
+        else:
+            keys.append('esc' if data[i] == '\x1b' else data[i])
+            i += 1
+    return keys
+
+def read_keys(fd):
+    # Blocks for the first key; bytes already queued (key repeat) come back with it
+    return parse_keys(os.read(fd, 1024).decode('utf-8', errors='ignore'))
@@ -0,0 +1,128 @@
+"""
+search_index.py - Per-column search index behind touchup's find commands.
+
+Each column is indexed the first time it is searched (or up front for the hero
+column), on a background thread:
+
+- an exact-value hash index (value -> rows), used for "=value" queries;
+- trigram postings (trigram -> rows) for substring queries of 3+ characters.
+  Candidates from the postings intersection are verified against the value.
+  Columns with more than TRIGRAM_CHAR_BUDGET characters skip the trigrams and
+  fall back to a scan, since Python sets of that many postings cost more
+  memory than the frame.
+
+"/pattern/" queries are regular expressions and always scan. Edits are applied
+with update(), so the index never needs rebuilding during a session.
+"""
+
+import re
+import threading
+
+TRIGRAM_CHAR_BUDGET = 5_000_000
+RESULT_CACHE_SIZE = 8
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def parse_query(query):
+    # "/regex/" -> ('regex', pattern), "=value" -> ('exact', value), else ('substring', text)
+    if len(query) >= 2 and query.startswith('/') and query.endswith('/'):
+        return 'regex', query[1:-1]
+    if query.startswith('=') and len(query) > 1:
+        return 'exact', query[1:]
+    return 'substring', query
+
+class ColumnIndex:
+    def __init__(self, load_values):
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._pending = []
+        self._results = {}
+        self._thread = threading.Thread(target=self._build, args=(load_values,), daemon=True)
+        self._thread.start()
+
+    def _build(self, load_values):
+        # Same string form the old linear find used (NaN -> 'nan')
+        values = load_values().astype(str).tolist()
+        exact = {}
+        for row, value in enumerate(values):
+            exact.setdefault(value, set()).add(row)
+        postings = None
+        if sum(map(len, values)) <= TRIGRAM_CHAR_BUDGET:
+            postings = {}
+            for row, value in enumerate(values):
+                for gram in trigrams(value):
+                    postings.setdefault(gram, set()).add(row)
+        with self._lock:
+            self.values, self.exact, self.postings = values, exact, postings
+            for row, value in self._pending:
+                self._set(row, value)
+            self._pending = []
+            self.ready.set()
+
+    def _set(self, row, value):
+        old = self.values[row]
+        if old == value:
+            return
+        self.exact[old].discard(row)
+        if not self.exact[old]:
+            del self.exact[old]
+        self.exact.setdefault(value, set()).add(row)
+        if self.postings is not None:
+            for gram in trigrams(old) - trigrams(value):
+                self.postings[gram].discard(row)
+            for gram in trigrams(value):
+                self.postings.setdefault(gram, set()).add(row)
+        self.values[row] = value
+        self._results.clear()
+
+    def update(self, row, value):
+        with self._lock:
+            if self.ready.is_set():
+                self._set(row, str(value))
+            else:
+                self._pending.append((row, str(value)))
+
+    def search(self, query):
+        """
+        Return the sorted row positions matching query (see parse_query).
+        Blocks until the background build has finished. Raises re.error for
+        an invalid regex.
+        """
+        self.ready.wait()
+        with self._lock:
+            if query not in self._results:
+                if len(self._results) >= RESULT_CACHE_SIZE:
+                    self._results.pop(next(iter(self._results)))
+                self._results[query] = self._search(*parse_query(query))
+            return self._results[query]
+
+    def _search(self, kind, text):
+        if kind == 'regex':
+            pattern = re.compile(text)
+            return [row for row, value in enumerate(self.values) if pattern.search(value)]
+        if kind == 'exact':
+            return sorted(self.exact.get(text, ()))
+        if len(text) >= 3 and self.postings is not None:
+            grams = sorted((self.postings.get(gram, set()) for gram in trigrams(text)), key=len)
+            candidates = set.intersection(*grams)
+            return sorted(row for row in candidates if text in self.values[row])
+        return [row for row, value in enumerate(self.values) if text in value]
+
+class SearchIndex:
+    def __init__(self, df):
+        self.df = df
+        self.columns = {}
+
+    def column(self, column_name):
+        # Starts the background build on first use
+        if column_name not in self.columns:
+            self.columns[column_name] = ColumnIndex(lambda: self.df[column_name])
+        return self.columns[column_name]
+
+    def search(self, column_name, query):
+        return self.column(column_name).search(query)
+
+    def update(self, row, column_name, value):
+        if column_name in self.columns:
+            self.columns[column_name].update(row, value)
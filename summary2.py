@@ -1,13 +1,45 @@
+import argparse
+import functools
 import re
-import spacy
-from transformers import pipeline
+import time
 from typing import List
-
-# Load spaCy's English model for tokenization and basic NLP tasks
-nlp_spacy = spacy.load("en_core_web_sm")
-
-# Load Hugging Face's transformers pipeline for NER (use BERT-based model)
-nlp_hf = pipeline("ner", model="dbmdz/bert-large-cased-finetuned-conll03-english")
+from text_normaliser import normalise_description
+from date_normaliser import DAY_MONTH_YEAR_PATTERN
+
+NER_MODEL = "dbmdz/bert-large-cased-finetuned-conll03-english"
+# pytorch: fp32 as published; int8: dynamically quantised Linear layers; onnx: ONNX Runtime on CPU
+NER_BACKENDS = ("pytorch", "int8", "onnx")
+BENCHMARK_INPUT = "data/whitby.csv"
+
+# Models are loaded on first use, so importing this module (e.g. for the
+# process_resources NER tier) doesn't pay for spaCy or transformers.
+@functools.lru_cache(maxsize=None)
+def get_spacy():
+    # spaCy's English model for tokenization and basic NLP tasks
+    import spacy
+    return spacy.load("en_core_web_sm")
+
+def load_ner_model(backend):
+    from transformers import AutoModelForTokenClassification
+    if backend == "pytorch":
+        return AutoModelForTokenClassification.from_pretrained(NER_MODEL)
+    if backend == "int8":
+        import torch
+        model = AutoModelForTokenClassification.from_pretrained(NER_MODEL)
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend == "onnx":
+        # optional dependency: pip install optimum[onnxruntime]
+        from optimum.onnxruntime import ORTModelForTokenClassification
+        return ORTModelForTokenClassification.from_pretrained(NER_MODEL, export=True)
+    raise ValueError(f"Unknown NER backend '{backend}', expected one of {NER_BACKENDS}")
+
+@functools.lru_cache(maxsize=None)
+def get_ner_pipeline(backend="pytorch"):
+    # Hugging Face's transformers pipeline for NER (BERT-based model), with
+    # word pieces grouped into whole entities ("entity_group": PER/LOC/ORG/MISC)
+    from transformers import AutoTokenizer, pipeline
+    return pipeline("ner", model=load_ner_model(backend), tokenizer=AutoTokenizer.from_pretrained(NER_MODEL),
+                    aggregation_strategy="simple", device=-1)
 
 # Define the Person and Case classes to store structured data
 class Person:
@@ -32,6 +64,10 @@ class Case:
     def __repr__(self):
         return f"Case(date={self.date}, offence={self.offence}, offence_location={self.offence_location}, court={self.court}, defendants={self.defendants})"
 
+PUNCTUATION_PATTERN = re.compile(r'([.,!?;])')
+OFFENCE_PATTERN = re.compile(r"for ([a-zA-Z\s]+(?:\w+))")
+DATE_PATTERN = re.compile(DAY_MONTH_YEAR_PATTERN)
+
 # Preprocess the text: cleaning and tokenization
 def preprocess_text(text):
     """
@@ -39,50 +75,102 @@ def preprocess_text(text):
     - Strip leading/trailing whitespace
     - Normalize spaces and punctuation
     """
-    # Remove extra spaces and normalize punctuation
-    text = re.sub(r'\s+', ' ', text).strip()
-    text = re.sub(r'([.,!?;])', r' \1', text)  # Add space before punctuation
+    # Split run-together sentences, collapse spaces, then space out punctuation
+    text = normalise_description(text)
+    text = PUNCTUATION_PATTERN.sub(r' \1', text)  # Add space before punctuation
 
     # Tokenize and remove stop words if needed (using spaCy for this)
-    doc = nlp_spacy(text)
+    doc = get_spacy()(text)
     cleaned_text = ' '.join([token.text for token in doc if not token.is_stop])
     
     return cleaned_text
 
-# Extract entities using spaCy and Hugging Face transformers NER
-def extract_entities(text):
-    """
-    Use spaCy for tokenization and Hugging Face transformers for NER.
-    """
+# Sort aggregated NER results (plus a date pattern: CoNLL-03 has no DATE label) into an entities dict
+def entities_from_ner(text, ner_results):
     entities = {
         "persons": [],
-        "dates": [],
+        "dates": [" ".join(match.group('day', 'month', 'year')) for match in DATE_PATTERN.finditer(text)],
         "locations": [],
         "offence": "",
     }
 
-    # Use Hugging Face's transformer pipeline for NER
-    ner_results = nlp_hf(text)
-
     # Process Hugging Face NER results
     for entity in ner_results:
-        label = entity['entity']
+        label = entity['entity_group']
         word = entity['word']
-        if label == 'B-PER':
+        if label == 'PER':
             entities["persons"].append(word)  # Add to persons list
-        elif label == 'B-DATE':
-            entities["dates"].append(word)  # Add to dates list
-        elif label == 'B-LOC':
+        elif label == 'LOC':
             entities["locations"].append(word)  # Add to locations list
 
     # Manually define a basic pattern for the offence (for simplicity)
-    offence_pattern = r"for ([a-zA-Z\s]+(?:\w+))"
-    match = re.search(offence_pattern, text)
+    match = OFFENCE_PATTERN.search(text)
     if match:
         entities["offence"] = match.group(1)
 
     return entities
 
+# Extract entities using spaCy and Hugging Face transformers NER
+def extract_entities(text):
+    """
+    Use spaCy for tokenization and Hugging Face transformers for NER.
+    """
+    # Use Hugging Face's transformer pipeline for NER
+    return entities_from_ner(text, get_ner_pipeline()(text))
+
+def extract_entities_batch(texts, batch_size=16, backend="pytorch"):
+    """
+    Run the NER pipeline over a list of texts in batches; returns one
+    entities dict per text, in order. Texts are sorted by length first so
+    each batch is padded only to its own longest member.
+    """
+    texts = list(texts)
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    sorted_results = get_ner_pipeline(backend)([texts[i] for i in order], batch_size=batch_size)
+
+    ner_results = [None] * len(texts)
+    for i, result in zip(order, sorted_results):
+        ner_results[i] = result
+    return [entities_from_ner(text, result) for text, result in zip(texts, ner_results)]
+
+def entity_set(entities):
+    return {("PER", p) for p in entities["persons"]} | {("LOC", l) for l in entities["locations"]}
+
+def entity_agreement(baseline, candidate):
+    # Mean per-record Jaccard similarity of (label, text) entity sets
+    scores = []
+    for expected, actual in zip(baseline, candidate):
+        expected, actual = entity_set(expected), entity_set(actual)
+        union = expected | actual
+        scores.append(len(expected & actual) / len(union) if union else 1.0)
+    return sum(scores) / len(scores) if scores else 1.0
+
+def benchmark_backends(texts, backends=NER_BACKENDS, batch_size=16):
+    """
+    Time each backend over the same texts (model load excluded) and compare
+    its entities with the first backend's. Returns one result dict per backend.
+    """
+    results = []
+    baseline = None
+    for backend in backends:
+        get_ner_pipeline(backend)  # load outside the timed section
+        started = time.perf_counter()
+        entities = extract_entities_batch(texts, batch_size=batch_size, backend=backend)
+        seconds = time.perf_counter() - started
+        baseline = baseline or entities
+        results.append({
+            "backend": backend,
+            "records_per_sec": len(texts) / seconds if seconds else float("inf"),
+            "agreement": entity_agreement(baseline, entities),
+        })
+    return results
+
+def print_benchmark(results, record_count):
+    print(f"{record_count} records")
+    print(f"{'backend':<10}{'records/s':>12}{'agreement':>12}")
+    for r in results:
+        print(f"{r['backend']:<10}{r['records_per_sec']:>12.1f}{r['agreement']:>12.3f}")
+
 # Map extracted entities to structured data (Case and Person)
 def map_to_case_structure(entities):
     """
@@ -127,11 +215,29 @@ def test_case_extraction(input_text):
     # Output the result
     return case_structure
 
-# Sample test data (from your example)
-input_text = "Summary conviction of William Tooley of Liverton Mines miner for trespassing in the daytime in search of conies on a piece of land in the possession and occupation of Sir Charles Mark Palmer. Offence committed at the township of Roxby on 26 September 1888. Whitby Strand Petty Sessional division - case heard at Whitby."
-
-# Test the extraction function
-result = test_case_extraction(input_text)
-
-# Print the result (structured Case object)
-print(result)
\ No newline at end of file
+## python3 -m summary2
+## python3 -m summary2 --benchmark --limit 500
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transformer NER extraction experiments.")
+    parser.add_argument('--benchmark', action='store_true', help="Compare NER backends on the Whitby descriptions.")
+    parser.add_argument('--input', default=BENCHMARK_INPUT, help="CSV with a 'description' column.")
+    parser.add_argument('--limit', type=int, default=None, help="Only use the first N descriptions.")
+    parser.add_argument('--backends', nargs='+', default=list(NER_BACKENDS), choices=NER_BACKENDS)
+    parser.add_argument('--batch-size', type=int, default=16)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        import pandas as pd
+        descriptions = pd.read_csv(args.input)['description'].dropna()
+        texts = [normalise_description(text) for text in descriptions[:args.limit]]
+        print_benchmark(benchmark_backends(texts, args.backends, args.batch_size), len(texts))
+        raise SystemExit(0)
+
+    # Sample test data (from your example)
+    input_text = "Summary conviction of William Tooley of Liverton Mines miner for trespassing in the daytime in search of conies on a piece of land in the possession and occupation of Sir Charles Mark Palmer. Offence committed at the township of Roxby on 26 September 1888. Whitby Strand Petty Sessional division - case heard at Whitby."
+
+    # Test the extraction function
+    result = test_case_extraction(input_text)
+
+    # Print the result (structured Case object)
+    print(result)
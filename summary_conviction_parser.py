@@ -1,96 +1,27 @@
-import re
-from datetime import datetime
-import spacy
-import gender_guesser.detector as gender
 from data_models import Case, Person
+from date_normaliser import MONTHS, format_iso_date
+from text_normaliser import normalise_description
+from gender_lookup import lookup_gender
 from summary_conviction_testcases import Testcases
+from conviction_pipeline import PIPELINE_VERSION_KEY, load_pipeline
 import pprint
-from spacy.util import filter_spans
-
-def load_data(file_path):
-    with open(file_path, 'r') as file:
-        # Strip newline characters and empty lines
-        data = [line.strip() for line in file if line.strip()]
-    return tuple(data)  # Using tuple to make it immutable (const-like)
-
-ADDITIONAL_PERSON_NAMES= load_data("data/person_names.txt")
-
-ADDITIONAL_PLACE_NAMES = [
-    #"Aislaby",
-    "Barnby",
-    #"Briggswath",
-    #"Danby",
-    #"Danby End",
-    "Eskdaleside",
-    "Glaisdale",
-    "Hartlepool",
-    "Hawsker cum Stainsacre",
-    #"Hutton Mulgrave",
-    #"Kirby Moorside",
-    #"Levisham",
-    "Liverton Mines",
-    "Lythe",
-    #"Mickleby",
-    "Newholm cum Dunsley",
-    #"Old Malton",
-    #"Rosedale",
-    #"Robin Hood's Bay",
-    "Roxby",
-    #"Ugglebarnby",
-   #"Victoria Road"
-]
-
-nlp_processor = spacy.load("en_core_web_sm")
-gender_detector = gender.Detector(case_sensitive=False)
-
-def nlp(str):
-    doc = nlp_processor(str)
-    doc=tag_additional_places(doc)
-    doc=tag_additional_people(doc)
-    return(doc)
-
-from spacy.util import filter_spans
-
-def tag_additional_entities(doc, names, label):
-    new_spans = []
-
-    for name in names:
-        start = 0
-        while True:
-            start = doc.text.find(name, start)
-            if start == -1:
-                break
-            end = start + len(name)
-
-            span = doc.char_span(start, end, label=label, alignment_mode="contract")
-            if span:
-                new_spans.append(span)
-
-            start = end
-
-    # Remove any existing entities that overlap with new ones (by token range)
-    def overlaps(ent1, ent2):
-        return ent1.start < ent2.end and ent2.start < ent1.end
-
-    filtered_existing = [
-        ent for ent in doc.ents
-        if not any(overlaps(ent, new) for new in new_spans)
-    ]
-
-    # Combine and filter to remove overlaps
-    all_spans = filtered_existing + new_spans
-    doc.ents = filter_spans(all_spans)  # ensures no token overlaps
-
-    return doc
-
 
+nlp_processor = load_pipeline()
+PIPELINE_VERSION = nlp_processor.meta[PIPELINE_VERSION_KEY]
 
+# Optional doc_cache.DocCache; when set, every parse (including the sub-parses
+# in extract_residence/extract_occupation) is looked up there first
+doc_cache = None
 
-def tag_additional_people(doc):
-    return tag_additional_entities(doc, ADDITIONAL_PERSON_NAMES, "PERSON")
+def use_doc_cache(cache):
+    global doc_cache
+    doc_cache = cache
 
-def tag_additional_places(doc):
-    return tag_additional_entities(doc, ADDITIONAL_PLACE_NAMES, "LOC")
+def nlp(str):
+    # Gazetteer places/people are tagged by the pipeline's entity_ruler
+    if doc_cache is not None:
+        return doc_cache.parse(nlp_processor, str)
+    return nlp_processor(str)
 
 def find_place_text(name_idx, places):
     return next((place["text"] for place in places if name_idx < place["end"]), None)
@@ -169,8 +100,7 @@ def extract_occupation(doc, start_idx):
 
 def detect_gender(forenames: str) -> str | None:
     first_name = forenames.split()[0]
-    gender_map = {"male": "male", "mostly_male": "male", "female": "female", "mostly_female": "female"}
-    return gender_map.get(gender_detector.get_gender(first_name))
+    return lookup_gender(first_name)
 
 def create_defendant(name_tokens, doc, end_idx, seen_names):
     if len(name_tokens) < 2:
@@ -249,12 +179,6 @@ def extract_defendants(doc):
     return defendants
 
 def extract_date(doc):
-    months = {
-        "january", "february", "march", "april", "may", "june", "july",
-        "august", "september", "october", "november", "december",
-        "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "oct", "nov", "dec"
-    }
-
     date_tokens = []
     collecting = False
 
@@ -264,19 +188,12 @@ def extract_date(doc):
             collecting = True
             continue
         if collecting:
-            if token.text.isdigit() or lower_text in months:
+            if token.text.isdigit() or lower_text in MONTHS:
                 date_tokens.append(token.text)
             elif date_tokens:
                 break
 
-    date_str = " ".join(date_tokens)
-    for fmt in ("%d %B %Y", "%d %b %Y"):
-        try:
-            return datetime.strptime(date_str, fmt).strftime("%Y-%m-%d")
-        except ValueError:
-            pass
-
-    return None
+    return format_iso_date(date_tokens)
 
 def extract_offence(doc):
     offence_tokens = []
@@ -317,13 +234,8 @@ def extract_court(doc):
         return court
     return None
 
-def insert_dot_space_after_numbers(text):
-    pattern = r'(\d+)([A-Z])'
-    return re.sub(pattern, r'\1. \2', text)
-
-def parse_conviction(input_str: str) -> Case | None:
-    input_str = re.sub(r'([a-z])([A-Z])', r'\1. \2', input_str)
-    input_str = insert_dot_space_after_numbers(input_str)
+def parse_normalised_conviction(input_str: str) -> Case | None:
+    # input_str must already have been through text_normaliser.normalise_description
     doc = nlp(input_str)
 
     result = {
@@ -337,6 +249,9 @@ def parse_conviction(input_str: str) -> Case | None:
     filtered_result = {k: v for k, v in result.items() if v}
     return Case(**filtered_result) if filtered_result else None
 
+def parse_conviction(input_str: str) -> Case | None:
+    return parse_normalised_conviction(normalise_description(input_str))
+
 def test_attribute_extraction(key, mute=False):
     data = Testcases.samples()
     
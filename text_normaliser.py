@@ -0,0 +1,27 @@
+import hashlib
+import re
+
+# Catalogue descriptions run sentences together, e.g. "Sir Charles Mark PalmerOffence committed"
+CAMEL_JOIN_PATTERN = re.compile(r'([a-z])([A-Z])')
+# ... and "on 26 September 1888Whitby Strand"
+NUMBER_JOIN_PATTERN = re.compile(r'(\d+)([A-Z])')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+def insert_dot_space_after_numbers(text):
+    return NUMBER_JOIN_PATTERN.sub(r'\1. \2', text)
+
+def normalise_description(text):
+    text = CAMEL_JOIN_PATTERN.sub(r'\1. \2', text)
+    text = insert_dot_space_after_numbers(text)
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+def normalise_descriptions(series):
+    # Same steps as normalise_description, applied to a whole column at once
+    text = series.astype('string')
+    text = text.str.replace(CAMEL_JOIN_PATTERN, r'\1. \2', regex=True)
+    text = text.str.replace(NUMBER_JOIN_PATTERN, r'\1. \2', regex=True)
+    text = text.str.replace(WHITESPACE_PATTERN, ' ', regex=True).str.strip()
+    return text.astype(object).where(text.notna(), None)
+
+def text_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
@@ -13,29 +13,55 @@ Key Features:
 --------------------------------------------------------------------------------
 - Loads CSV files and displays data row-by-row with optional "hero" column shown
   prominently at the top.
-- Navigation commands: next, prev, go to row.
-- Edit commands: edit a specific cell either via command args or interactive prompt.
+- Navigation commands: next, prev, go to row, through file order or a sort/filter
+  view (cached row-position arrays from row_views; the frame is never reordered).
+- Edit commands: edit a specific cell either via command args or interactive prompt,
+  or bulk-edit a column over filtered rows.
 - Undo/redo support for changes.
-- Save changes with timestamped backup filenames.
-- Search for values within columns.
+- Save changes with timestamped backup filenames, or (--save-mode patch) save
+  only the changed cells to <base>.patch.json, atomically, optionally from a
+  coalescing background autosave (--autosave SECONDS).
+- Search within columns: substring, exact (=value) or regex (/pattern/), with
+  find-next/prev and find-all. Backed by search_index (per-column hash and
+  trigram indexes built in the background and updated on every edit).
+- Honours a <base>.schema.json sidecar (written by process_resources) so
+  low-cardinality columns load as categoricals; timestamped saves get a copy
+  of the sidecar.
+- --lazy pages rows in from a memory-mapped file (lazy_csv.LazyFrame) so very
+  large CSVs open immediately; find still reads the searched column in full.
 - Color-coded CLI output for improved readability.
 - Graceful handling of invalid inputs and commands.
 
 --------------------------------------------------------------------------------
 Usage:
 --------------------------------------------------------------------------------
-$ python touchup.py <filename.csv> [--hero ColumnName]
+$ python touchup.py <filename.csv> [--hero ColumnName] [--lazy]
+                   [--save-mode copy|patch] [--autosave SECONDS]
 
 Interactive commands once running:
 - n / next       : Move to next row
+- nav           : Single-key navigation (n/p or arrow keys, key repeat), q to leave
 - p / prev       : Move to previous row
 - e / edit       : Edit cell (prompts if no args)
 - s / save       : Save changes
 - q / quit       : Exit program (prompts to save if modified)
-- g / go         : Jump to row number
-- f / find       : Search for text in column
+- g / go         : Jump to row number (position within the active view)
+- sort <col> [desc] / sort off   : Navigate in sorted order
+- filter <expr> / filter off     : Navigate only rows matching a pandas expression
+- view [n|off]   : List cached views, switch to one, or return to file order
+- f / find       : Search for text in column (from the current row on)
+- fn / findnext  : Jump to the next match of the last search
+- fp / findprev  : Jump to the previous match of the last search
+- fa / findall   : Count matches and list their row numbers
+- facet <col> [n]: Distinct/null counts, most common and rarest values
+- fj <number>    : Jump to rows holding a listed facet value (then fn/fp)
+- consolidate   : (patch mode) Fold the patch into the base file and drop it
+- bulk [column]  : Replace text (literal or regex) or assign a value across
+                  the rows matching a filter; previewed, one undo entry
 - undo          : Undo last edit
 - redo          : Redo last undone edit
+- reparse       : Re-parse the row's description via parser_service and
+                  offer the refreshed derived fields
 
 Run tests with:
 $ python touchup.py --test
@@ -73,13 +99,13 @@ Context for Future Sessions:
 --------------------------------------------------------------------------------
 - The class TouchUp encapsulates all logic and state.
 - Command map dispatches commands to methods.
-- Undo/redo store deep copies of DataFrame states.
+- Undo/redo keep a log of (row, column, old, new) deltas, one entry per command.
 - Colorama color codes require substring matching in input mocks.
 - Tests are integrated but isolated via fixtures.
 - The main() function parses CLI args and runs interactive loop or tests.
 - Use pytest or manual runs for development.
-- Clear_screen() adapts to OS.
-- File saves append timestamp suffix.
+- display_row() renders through screen.Screen, which repaints only changed lines.
+- File saves append timestamp suffix (copy mode) or rewrite <base>.patch.json (patch mode).
 - Prompts and outputs are richly colored.
 - Interactive mode loops endlessly until quit.
 - All code is contained in this single file for easy deployment.
@@ -88,26 +114,58 @@ Please refer back to this block before continuing development or troubleshooting
 """
 
 import argparse
+import numpy as np
 import pandas as pd
 import os
-import platform
 import sys
 import datetime
-from colorama import init, Fore
+import bisect
+import io
+import json
+import re
+import threading
+import time
+from colorama import init, Fore, Style
 import pytest
+from data_schema import coerce_value, coerce_values, copy_schema, evaluate_predicate, json_value, read_csv_with_schema, set_cell, set_cells
+from lazy_csv import LazyFrame, replace_csv
+from search_index import SearchIndex
+from facets import ColumnFacets
+from row_views import ViewCache, describe
+from screen import CLEAR, Screen, parse_keys, read_keys
+from parser_service import ParserServiceError, reparse_row
 
 init(autoreset=True)
 
 class TouchUp:
-    def __init__(self, filename, hero_column=None):
+    def __init__(self, filename, hero_column=None, lazy=False, save_mode='copy', autosave=None):
         self.filename = filename
         self.hero_column = hero_column
+        self.lazy = lazy
+        self.save_mode = 'patch' if autosave else save_mode
         self.modified = False
         self.df = self.load_csv(filename)
+        self.screen = Screen()
+        self.changed_cells = {}
+        self.save_lock = threading.Lock()
+        self.autosave_event = None
+        if self.save_mode == 'patch':
+            self.load_patch()
         self.current_row = 0
         self.total_rows = len(self.df)
         self.undo_stack = []
         self.redo_stack = []
+        self.search_index = SearchIndex(self.df)
+        self.last_find = None
+        self.facets = {}
+        self.facet_choices = None
+        self.views = ViewCache(self.df)
+        self.view_filter = None
+        self.view_sort = None
+        self.view = None
+        self.view_pos = 0
+        if self.hero_column in self.df.columns:
+            self.search_index.column(self.hero_column)
         self.command_map = {
             'next': self.next_row,
             'prev': self.prev_row,
@@ -123,9 +181,26 @@ class TouchUp:
             'go': self.go_to,
             'f': self.find,
             'find': self.find,
+            'fn': self.find_next,
+            'findnext': self.find_next,
+            'fp': self.find_prev,
+            'findprev': self.find_prev,
+            'fa': self.find_all,
+            'findall': self.find_all,
             'undo': self.undo,
             'redo': self.redo,
+            'reparse': self.reparse,
+            'consolidate': self.consolidate,
+            'nav': self.navigate,
+            'bulk': self.bulk_edit,
+            'facet': self.facet,
+            'fj': self.facet_jump,
+            'sort': self.sort_view,
+            'filter': self.filter_view,
+            'view': self.switch_view,
         }
+        if autosave:
+            self.start_autosave(autosave)
 
     def load_csv(self, filename):
         if not os.path.exists(filename):
@@ -133,7 +208,7 @@ class TouchUp:
         if os.path.getsize(filename) == 0:
             raise ValueError(f"{Fore.RED}Error: The file '{filename}' is empty.")
         try:
-            df = pd.read_csv(filename)
+            df = LazyFrame(filename) if self.lazy else read_csv_with_schema(filename)
             if df.empty or all(df.columns.to_list()) == ['Unnamed: 0'] and df.empty:
                 raise ValueError(f"{Fore.RED}Error: The file '{filename}' does not contain valid data.")
             return df
@@ -141,45 +216,240 @@ class TouchUp:
             raise ValueError(f"{Fore.RED}Error: Unable to parse the file '{filename}'. {e}")
 
     def save_csv(self):
+        if self.save_mode == 'patch':
+            try:
+                path, count = self.save_patch()
+                print(f"{Fore.GREEN}Saved {count} changed cells to {path}.")
+                self.modified = False
+            except Exception as e:
+                print(f"{Fore.RED}Error: Unable to save the patch file '{self.patch_path()}'. {e}")
+            return
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         base, ext = os.path.splitext(self.filename)
         save_name = f"{base}_{timestamp}{ext}"
         try:
-            self.df.to_csv(save_name, index=False)
+            self.df.to_csv(save_name + '.tmp', index=False)
+            copy_schema(self.filename, save_name)
+            replace_csv(save_name + '.tmp', save_name)
             print(f"{Fore.GREEN}Changes saved to {save_name}.")
             self.modified = False
         except Exception as e:
             print(f"{Fore.RED}Error: Unable to save the file '{save_name}'. {e}")
 
+    def patch_path(self):
+        return os.path.splitext(self.filename)[0] + '.patch.json'
+
+    def base_signature(self):
+        # A patch only applies to the exact base file it was written against
+        stat = os.stat(self.filename)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def load_patch(self):
+        path = self.patch_path()
+        if not os.path.exists(path):
+            return
+        with open(path, 'r') as f:
+            patch = json.load(f)
+        if patch['base'] != self.base_signature():
+            print(f"{Fore.RED}Warning: {path} was written against a different version of {self.filename}; not applied.")
+            return
+        for row, column_name, value in patch['cells']:
+            set_cell(self.df, row, column_name, value)
+            self.changed_cells[(row, column_name)] = value
+        print(f"{Fore.GREEN}Applied {len(patch['cells'])} saved changes from {path}.")
+
+    def save_patch(self):
+        """
+        Write every cell changed since the base file was last consolidated to
+        <base>.patch.json (temp file + rename). Returns (path, cell count).
+        """
+        with self.save_lock:
+            cells = [[json_value(row), column_name, json_value(value)]
+                     for (row, column_name), value in self.changed_cells.items()]
+        path = self.patch_path()
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'base': self.base_signature(), 'cells': cells}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+        return path, len(cells)
+
+    def start_autosave(self, interval):
+        self.autosave_event = threading.Event()
+        threading.Thread(target=self.autosave_loop, args=(interval,), daemon=True).start()
+
+    def autosave_loop(self, interval):
+        while True:
+            self.autosave_event.wait()
+            # Edits made while we wait are coalesced into the same write
+            time.sleep(interval)
+            self.autosave_event.clear()
+            try:
+                self.save_patch()
+                if not self.autosave_event.is_set():
+                    self.modified = False
+            except OSError as e:
+                print(f"{Fore.RED}Autosave failed: {e}")
+
+    def consolidate(self, *args):
+        if self.save_mode != 'patch':
+            print(f"{Fore.RED}consolidate only applies in patch save mode (--save-mode patch).")
+            return
+        # Fold the patch into the base file with one atomic rewrite, then drop it
+        try:
+            with self.save_lock:
+                self.df.to_csv(self.filename + '.tmp', index=False)
+                replace_csv(self.filename + '.tmp', self.filename)
+                self.changed_cells.clear()
+                if os.path.exists(self.patch_path()):
+                    os.remove(self.patch_path())
+            self.modified = False
+            print(f"{Fore.GREEN}Consolidated changes into {self.filename}.")
+        except Exception as e:
+            print(f"{Fore.RED}Error: Unable to consolidate into '{self.filename}'. {e}")
+
     def clear_screen(self):
-        system = platform.system()
-        if system == "Windows":
-            os.system('cls')
-        else:
-            os.system('clear')
+        self.screen.clear()
 
     def display_row(self):
-        self.clear_screen()
+        # Fetch the row once; the screen only repaints lines that changed
+        row = self.df.iloc[self.current_row]
+        lines = []
         if self.hero_column and self.hero_column in self.df.columns:
-            print(f"{Fore.CYAN}\n{self.hero_column}: {self.df.iloc[self.current_row][self.hero_column]}")
-        print(f"{Fore.YELLOW}\nRow {self.current_row + 1}/{self.total_rows}\n")
-        for col in self.df.columns:
-            print(f"{col}: {self.df.iloc[self.current_row][col]}")
+            lines += ['', f"{Fore.CYAN}{self.hero_column}: {row[self.hero_column]}{Style.RESET_ALL}"]
+        if self.view is None:
+            position = f"Row {self.current_row + 1}/{self.total_rows}"
+        elif self.sync_view_position():
+            position = (f"Row {self.view_pos + 1}/{len(self.view)} in view "
+                        f"({describe(self.view_filter, self.view_sort)}; file row {self.current_row + 1})")
+        else:
+            position = f"File row {self.current_row + 1} (not in view: {describe(self.view_filter, self.view_sort)})"
+        lines += ['', f"{Fore.YELLOW}{position}{Style.RESET_ALL}", '']
+        lines += [f"{col}: {value}" for col, value in row.items()]
+        self.screen.render(lines)
 
     def display_commands(self):
         print(f"\n{Fore.BLUE}Commands:")
         print(f"  ({Fore.WHITE}n{Fore.GREEN})ext, ({Fore.WHITE}p{Fore.GREEN})rev, ({Fore.WHITE}e{Fore.GREEN})dit, "
               f"({Fore.WHITE}s{Fore.GREEN})ave, ({Fore.WHITE}q{Fore.GREEN})uit, ({Fore.WHITE}g{Fore.GREEN})o, "
-              f"({Fore.WHITE}f{Fore.GREEN})ind, {Fore.GREEN}undo, redo")
+              f"({Fore.WHITE}f{Fore.GREEN})ind, {Fore.GREEN}undo, redo, reparse, nav")
+
+    def step(self, n):
+        # Moves through the active view if there is one, otherwise file order
+        if self.view is None:
+            self.current_row = (self.current_row + n) % self.total_rows
+        else:
+            self.sync_view_position()
+            self.view_pos = (self.view_pos + n) % len(self.view)
+            self.current_row = int(self.view[self.view_pos])
 
     def next_row(self, *args):
-        self.current_row = (self.current_row + 1) % self.total_rows
+        self.step(1)
         self.display_row()
 
     def prev_row(self, *args):
-        self.current_row = (self.current_row - 1) % self.total_rows
+        self.step(-1)
         self.display_row()
 
+    def sync_view_position(self):
+        # find/fj/undo move current_row directly; re-locate it in the view
+        if self.view_pos < len(self.view) and self.view[self.view_pos] == self.current_row:
+            return True
+        positions = np.flatnonzero(self.view == self.current_row)
+        if len(positions):
+            self.view_pos = int(positions[0])
+            return True
+        return False
+
+    def set_view(self, filter_expr, sort):
+        if filter_expr is None and sort is None:
+            self.view_filter = self.view_sort = self.view = None
+            self.display_row()
+            print(f"{Fore.GREEN}Showing all rows in file order.")
+            return
+        try:
+            view = self.views.rows(filter_expr, sort)
+        except Exception as e:
+            print(f"{Fore.RED}Error: {e}")
+            return
+        if not len(view):
+            print(f"{Fore.RED}No rows match {describe(filter_expr, sort)}.")
+            return
+        self.view_filter, self.view_sort, self.view = filter_expr, sort, view
+        if not self.sync_view_position():
+            self.view_pos = 0
+            self.current_row = int(view[0])
+        self.display_row()
+        print(f"{Fore.GREEN}View: {describe(filter_expr, sort)} ({len(view)} rows).")
+
+    def sort_view(self, *args):
+        # sort <column> [desc] | sort off; keeps the current filter
+        if args and args[0] == 'off':
+            self.set_view(self.view_filter, None)
+        elif args and args[0] in self.df.columns:
+            self.set_view(self.view_filter, (args[0], len(args) > 1 and args[1] == 'desc'))
+        else:
+            print(f"{Fore.RED}Usage: sort <column> [desc] | sort off")
+
+    def filter_view(self, *args):
+        # filter <pandas expression> | filter off; keeps the current sort
+        if not args:
+            print(f"{Fore.RED}Usage: filter <expression> | filter off")
+        elif args == ('off',):
+            self.set_view(None, self.view_sort)
+        else:
+            self.set_view(" ".join(args), self.view_sort)
+
+    def switch_view(self, *args):
+        # view: list cached views | view <number>: switch to one | view off
+        specs = list(self.views.arrays)
+        if not args:
+            current = describe(self.view_filter, self.view_sort) or "file order"
+            print(f"{Fore.YELLOW}Current view: {current}")
+            for i, (filter_expr, sort) in enumerate(specs, 1):
+                print(f"  {Fore.WHITE}[{i}] {describe(filter_expr, sort)} ({len(self.views.arrays[(filter_expr, sort)])} rows)")
+        elif args[0] == 'off':
+            self.set_view(None, None)
+        else:
+            try:
+                filter_expr, sort = specs[int(args[0]) - 1]
+            except (ValueError, IndexError):
+                print(f"{Fore.RED}Choose a number from 1 to {len(specs)}.")
+                return
+            self.set_view(filter_expr, sort)
+
+    def navigate(self, *args):
+        # Single-key browsing: n/j/down/right next, p/k/up/left prev, q/Esc/Enter back to commands
+        try:
+            import termios
+            import tty
+        except ImportError:
+            print(f"{Fore.RED}nav mode needs a POSIX terminal.")
+            return
+        if not sys.stdin.isatty():
+            print(f"{Fore.RED}nav mode needs an interactive terminal.")
+            return
+        steps = {'n': 1, 'j': 1, 'down': 1, 'right': 1, 'p': -1, 'k': -1, 'up': -1, 'left': -1}
+        fd = sys.stdin.fileno()
+        saved = termios.tcgetattr(fd)
+        try:
+            tty.setcbreak(fd)
+            self.display_row()
+            print(f"{Fore.BLUE}nav: n/p or arrows to move, q to return")
+            while True:
+                keys = read_keys(fd)
+                done = any(key in ('q', 'esc', '\n') for key in keys)
+                step = sum(steps.get(key, 0) for key in keys)
+                if step:
+                    # Queued repeats are applied together and drawn once
+                    self.step(step)
+                    self.display_row()
+                    print(f"{Fore.BLUE}nav: n/p or arrows to move, q to return")
+                if done:
+                    break
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+
     def save(self, *args):
         if self.modified:
             self.save_csv()
@@ -187,6 +457,8 @@ class TouchUp:
             print(f"{Fore.GREEN}No changes to save.")
 
     def quit(self, *args):
+        if self.autosave_event and self.autosave_event.is_set():
+            self.save_csv()
         if self.modified:
             save_prompt = input(f"{Fore.RED}You have unsaved changes. Save before quitting? (y/n): ").strip().lower()
             if save_prompt == 'y':
@@ -205,12 +477,9 @@ class TouchUp:
             if column_name not in self.df.columns:
                 print(f"{Fore.RED}Error: Column '{column_name}' does not exist.")
                 return
-            self.push_undo()
-            self.df.at[self.current_row, column_name] = value
-            self.modified = True
-            self.redo_stack.clear()
-            self.display_row()
-            print(f"{Fore.GREEN}Successfully updated '{column_name}' to '{value}'.")
+            if self.apply_edits([(self.current_row, column_name, value)]):
+                self.display_row()
+                print(f"{Fore.GREEN}Successfully updated '{column_name}' to '{value}'.")
 
     def handle_edit_column(self):
         column_name = input(f"{Fore.CYAN}Enter the column name to edit (or press enter to cancel): {Fore.WHITE}").strip()
@@ -219,6 +488,7 @@ class TouchUp:
             return
         if column_name not in self.df.columns:
             print(f"{Fore.RED}Error: Column '{column_name}' does not exist.")
+            self.screen.invalidate()  # retries can scroll the frame before it is redrawn
             self.handle_edit_column()
         else:
             self.handle_edit_value(column_name)
@@ -228,26 +498,72 @@ class TouchUp:
         new_value = input(f"{Fore.CYAN}Enter new value for '{column_name}' (current value: '{current_value}'): {Fore.WHITE}").strip()
         if new_value == '':
             new_value = current_value
-        self.push_undo()
-        self.df.at[self.current_row, column_name] = new_value
-        self.modified = True
-        self.redo_stack.clear()
-        self.display_row()
-        print(f"{Fore.GREEN}Successfully updated '{column_name}' to '{new_value}'.")
+        if self.apply_edits([(self.current_row, column_name, new_value)]):
+            self.display_row()
+            print(f"{Fore.GREEN}Successfully updated '{column_name}' to '{new_value}'.")
+
+    def set_value(self, row, column_name, value):
+        if column_name in self.facets:
+            self.facets[column_name].update(self.df.at[row, column_name], value)
+        with self.save_lock:
+            set_cell(self.df, row, column_name, value)
+            self.changed_cells[(row, column_name)] = value
+        self.search_index.update(row, column_name, value)
+        if self.autosave_event:
+            self.autosave_event.set()
+
+    def set_values(self, rows, column_name, values):
+        if column_name in self.facets:
+            for old, new in zip(self.df.loc[rows, column_name].tolist(), values):
+                self.facets[column_name].update(old, new)
+        with self.save_lock:
+            set_cells(self.df, rows, column_name, values)
+            self.changed_cells.update(zip([(row, column_name) for row in rows], values))
+        for row, value in zip(rows, values):
+            self.search_index.update(row, column_name, value)
+        if self.autosave_event:
+            self.autosave_event.set()
+
+    def write_deltas(self, deltas):
+        # deltas are (row, column, value); multi-row columns get one vectorised write
+        by_column = {}
+        for row, column_name, value in deltas:
+            rows, values = by_column.setdefault(column_name, ([], []))
+            rows.append(row)
+            values.append(value)
+        for column_name, (rows, values) in by_column.items():
+            if len(rows) == 1:
+                self.set_value(rows[0], column_name, values[0])
+            else:
+                self.set_values(rows, column_name, values)
+            # The active view keeps its order; cached ones on this column are rebuilt on next use
+            self.views.invalidate(column_name)
+
+    def apply_edits(self, changes):
+        # One undo entry per command, however many cells it touches; returns False if a value is rejected
+        try:
+            changes = [(row, column_name, coerce_value(self.df.dtypes[column_name], value))
+                       for row, column_name, value in changes]
+        except ValueError as e:
+            print(f"{Fore.RED}Error: {e}. No changes made.")
+            return False
+        self.commit_entry([(row, column_name, self.df.at[row, column_name], value) for row, column_name, value in changes])
+        return True
 
-    def push_undo(self):
-        self.undo_stack.append(self.df.copy(deep=True))
-        if len(self.undo_stack) > 20:
-            self.undo_stack.pop(0)
+    def commit_entry(self, entry):
+        self.write_deltas([(row, column_name, new_value) for row, column_name, _, new_value in entry])
+        self.undo_stack.append(entry)
+        self.redo_stack.clear()
+        self.modified = True
 
     def undo(self, *args):
         if not self.undo_stack:
             print(f"{Fore.RED}Nothing to undo.")
             return
-        self.redo_stack.append(self.df.copy(deep=True))
-        self.df = self.undo_stack.pop()
-        self.total_rows = len(self.df)
-        self.current_row = min(self.current_row, self.total_rows - 1)
+        entry = self.undo_stack.pop()
+        self.write_deltas([(row, column_name, old_value) for row, column_name, old_value, _ in entry])
+        self.redo_stack.append(entry)
+        self.current_row = entry[0][0]
         self.modified = True
         self.display_row()
         print(f"{Fore.GREEN}Undo successful.")
@@ -256,15 +572,93 @@ class TouchUp:
         if not self.redo_stack:
             print(f"{Fore.RED}Nothing to redo.")
             return
-        self.undo_stack.append(self.df.copy(deep=True))
-        self.df = self.redo_stack.pop()
-        self.total_rows = len(self.df)
-        self.current_row = min(self.current_row, self.total_rows - 1)
+        entry = self.redo_stack.pop()
+        self.write_deltas([(row, column_name, new_value) for row, column_name, _, new_value in entry])
+        self.undo_stack.append(entry)
+        self.current_row = entry[0][0]
         self.modified = True
         self.display_row()
         print(f"{Fore.GREEN}Redo successful.")
 
+    def bulk_edit(self, *args):
+        """
+        Replace text (literal or regex) or assign a value in one column, over
+        the rows matching an optional pandas filter expression. Previews the
+        affected count and applies as one vectorised write and one undo entry.
+        """
+        column_name = args[0] if args else input(f"{Fore.CYAN}Column to edit: {Fore.WHITE}").strip()
+        if column_name not in self.df.columns:
+            print(f"{Fore.RED}Error: Column '{column_name}' does not exist.")
+            return
+        operation = input(f"{Fore.CYAN}Operation - replace, regex or set: {Fore.WHITE}").strip().lower()
+        if operation not in ('replace', 'regex', 'set'):
+            print(f"{Fore.RED}Unknown operation '{operation}'. Bulk edit cancelled.")
+            return
+        if operation == 'set':
+            find_str = None
+            new_value = input(f"{Fore.CYAN}Value to assign: {Fore.WHITE}")
+        else:
+            find_str = input(f"{Fore.CYAN}Find: {Fore.WHITE}")
+            new_value = input(f"{Fore.CYAN}Replace with: {Fore.WHITE}")
+        row_filter = input(f"{Fore.CYAN}Row filter, e.g. court == 'Whitby' (enter for all rows): {Fore.WHITE}").strip()
+
+        try:
+            column = self.df[column_name]
+            mask = pd.Series(True, index=column.index)
+            if row_filter:
+                mask = evaluate_predicate(self.df, row_filter)
+            if operation == 'set':
+                before = column[mask]
+                after = pd.Series(new_value, index=before.index, dtype=object)
+            else:
+                mask &= column.notna()
+                before = column[mask]
+                after = before.astype(str).str.replace(find_str, new_value, regex=operation == 'regex')
+            after = coerce_values(self.df.dtypes[column_name], after)
+        except Exception as e:
+            print(f"{Fore.RED}Error: {e}")
+            return
+
+        changed = before.astype(str) != after.astype(str)
+        rows = before.index[changed].tolist()
+        if not rows:
+            print(f"{Fore.YELLOW}No cells would change.")
+            return
+        print(f"{Fore.YELLOW}{len(rows)} cells in '{column_name}' will change, e.g.:")
+        for row in rows[:5]:
+            print(f"  row {row + 1}: {before[row]} -> {after[row]}")
+        if input(f"{Fore.CYAN}Apply? (y/n): {Fore.WHITE}").strip().lower() != 'y':
+            print(f"{Fore.RED}Bulk edit cancelled.")
+            return
+        self.commit_entry(list(zip(rows, [column_name] * len(rows), before[rows].tolist(), after[rows].tolist())))
+        self.current_row = rows[0]
+        self.screen.invalidate()  # the prompts and preview may have scrolled the frame
+        self.display_row()
+        print(f"{Fore.GREEN}Updated {len(rows)} cells in '{column_name}'.")
+
+    def reparse(self, *args):
+        try:
+            changes = reparse_row(self.df.iloc[self.current_row])
+        except ParserServiceError as e:
+            print(f"{Fore.RED}Error: {e}")
+            return
+        if not changes:
+            print(f"{Fore.GREEN}Parsed fields are already up to date.")
+            return
+        for column_name, new_value in changes.items():
+            print(f"{Fore.YELLOW}{column_name}: {Fore.WHITE}{self.df.at[self.current_row, column_name]} -> {new_value}")
+        confirm = input(f"{Fore.CYAN}Apply refreshed fields? (y/n): {Fore.WHITE}").strip().lower()
+        if confirm != 'y':
+            print(f"{Fore.RED}Reparse cancelled.")
+            return
+        if self.apply_edits([(self.current_row, column_name, new_value) for column_name, new_value in changes.items()]):
+            self.screen.invalidate()  # the listed changes may have scrolled the frame
+            self.display_row()
+            print(f"{Fore.GREEN}Updated {len(changes)} fields from the parser.")
+
     def go_to(self, *args):
+        # Row numbers are positions in the active view, or file rows without one
+        count = self.total_rows if self.view is None else len(self.view)
         if args:
             try:
                 row_num = int(args[0]) - 1
@@ -273,18 +667,22 @@ class TouchUp:
                 return
         else:
             try:
-                inp = input(f"{Fore.CYAN}Enter row number to go to (1-{self.total_rows}): {Fore.WHITE}")
+                inp = input(f"{Fore.CYAN}Enter row number to go to (1-{count}): {Fore.WHITE}")
                 row_num = int(inp) - 1
             except ValueError:
                 print(f"{Fore.RED}Invalid input.")
                 return
-        if not (0 <= row_num < self.total_rows):
+        if not (0 <= row_num < count):
             print(f"{Fore.RED}Row number out of range.")
             return
-        self.current_row = row_num
+        if self.view is None:
+            self.current_row = row_num
+        else:
+            self.view_pos = row_num
+            self.current_row = int(self.view[row_num])
         self.display_row()
 
-    def find(self, *args):
+    def read_find_args(self, args):
         if len(args) >= 2:
             column_name = args[0]
             search_str = " ".join(args[1:])
@@ -292,21 +690,117 @@ class TouchUp:
             column_name = input(f"{Fore.CYAN}Enter column name to search: {Fore.WHITE}").strip()
             if column_name not in self.df.columns:
                 print(f"{Fore.RED}Error: Column '{column_name}' does not exist.")
-                return
+                return None
             search_str = input(f"{Fore.CYAN}Enter search string: {Fore.WHITE}").strip()
         if column_name not in self.df.columns:
             print(f"{Fore.RED}Error: Column '{column_name}' does not exist.")
+            return None
+        return column_name, search_str
+
+    def find_matches(self, column_name, search_str):
+        try:
+            return self.search_index.search(column_name, search_str)
+        except re.error as e:
+            print(f"{Fore.RED}Invalid regular expression '{search_str}': {e}")
+            return None
+
+    def jump_to_match(self, column_name, search_str, matches, position):
+        # position wraps around either end of the match list
+        position %= len(matches)
+        self.current_row = matches[position]
+        self.display_row()
+        print(f"{Fore.GREEN}Found '{search_str}' in column '{column_name}' at row {self.current_row + 1} "
+              f"(match {position + 1} of {len(matches)}).")
+
+    def find(self, *args):
+        # Substring by default; "=value" for an exact match, "/pattern/" for a regex
+        find_args = self.read_find_args(args)
+        if find_args is None:
             return
-        found = False
-        for i, val in self.df[column_name].astype(str).items():
-            if search_str in val:
-                self.current_row = i
-                self.display_row()
-                print(f"{Fore.GREEN}Found '{search_str}' in column '{column_name}' at row {i + 1}.")
-                found = True
-                break
-        if not found:
+        column_name, search_str = find_args
+        matches = self.find_matches(column_name, search_str)
+        if matches is None:
+            return
+        self.last_find = find_args
+        if not matches:
             print(f"{Fore.RED}No match found for '{search_str}' in column '{column_name}'.")
+            return
+        self.jump_to_match(column_name, search_str, matches, bisect.bisect_left(matches, self.current_row))
+
+    def find_next(self, *args):
+        self.step_find(1)
+
+    def find_prev(self, *args):
+        self.step_find(-1)
+
+    def step_find(self, direction):
+        if self.last_find is None:
+            print(f"{Fore.RED}No previous search. Use find first.")
+            return
+        column_name, search_str = self.last_find
+        matches = self.find_matches(column_name, search_str)
+        if not matches:
+            print(f"{Fore.RED}No match found for '{search_str}' in column '{column_name}'.")
+            return
+        if direction > 0:
+            position = bisect.bisect_right(matches, self.current_row)
+        else:
+            position = bisect.bisect_left(matches, self.current_row) - 1
+        self.jump_to_match(column_name, search_str, matches, position)
+
+    def find_all(self, *args):
+        find_args = self.read_find_args(args)
+        if find_args is None:
+            return
+        column_name, search_str = find_args
+        matches = self.find_matches(column_name, search_str)
+        if matches is None:
+            return
+        self.last_find = find_args
+        print(f"{Fore.GREEN}{len(matches)} matches for '{search_str}' in column '{column_name}'.")
+        if matches:
+            shown = ", ".join(str(row + 1) for row in matches[:20])
+            more = f" ... (+{len(matches) - 20} more)" if len(matches) > 20 else ""
+            print(f"{Fore.WHITE}Rows: {shown}{more}")
+
+    def facet(self, *args):
+        # facet <column> [n]: distinct/null counts, the n most common and n rarest values
+        if not args or args[0] not in self.df.columns:
+            print(f"{Fore.RED}Usage: facet <column> [n]")
+            return
+        column_name = args[0]
+        try:
+            limit = int(args[1]) if len(args) > 1 else 10
+        except ValueError:
+            print(f"{Fore.RED}Invalid count '{args[1]}'.")
+            return
+        if column_name not in self.facets:
+            self.facets[column_name] = ColumnFacets(self.df[column_name])
+        facets = self.facets[column_name]
+        print(f"{Fore.YELLOW}{column_name}: {facets.distinct} distinct values, {facets.nulls} empty")
+        choices = []
+        for title, entries in (("Most common", facets.most_common(limit)), ("Rarest", facets.rarest(limit))):
+            print(f"{Fore.BLUE}{title}:")
+            for value, count in entries:
+                choices.append(value)
+                print(f"  {Fore.WHITE}[{len(choices)}] {value} ({count})")
+        self.facet_choices = (column_name, choices)
+        print(f"{Fore.BLUE}Use fj <number> to jump to matching rows, then fn/fp.")
+
+    def facet_jump(self, *args):
+        if self.facet_choices is None:
+            print(f"{Fore.RED}No facet listed yet. Use facet <column> first.")
+            return
+        column_name, choices = self.facet_choices
+        try:
+            value = choices[int(args[0]) - 1] if args and int(args[0]) >= 1 else None
+        except (ValueError, IndexError):
+            value = None
+        if value is None:
+            print(f"{Fore.RED}Choose a number from 1 to {len(choices)}.")
+            return
+        # The search index holds the same str() form, so this is an exact-match lookup
+        self.find(column_name, f"={value}")
 
     def parse_command(self, command):
         parts = command.strip().split()
@@ -325,15 +819,25 @@ class TouchUp:
         while True:
             prompt = (f"{Fore.CYAN}Enter command: {Fore.WHITE}")
             command = input(prompt).strip()
+            frames = self.screen.frames
             self.parse_command(command)
+            if self.screen.frames == frames:
+                # Output of a command that didn't redraw (facet, findall, errors) piles up
+                # below the frame and may have scrolled it
+                self.screen.invalidate()
             self.display_commands()
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="TouchUp: Command-line CSV data viewer.")
     parser.add_argument('filename', type=str, nargs='?', help="Path to the CSV file")
     parser.add_argument('--hero', type=str, help="Name of the column to display at the top of the page", default=None)
+    parser.add_argument('--lazy', action='store_true', help="Page rows in on demand instead of loading the whole file")
+    parser.add_argument('--save-mode', choices=['copy', 'patch'], default='copy',
+                        help="copy: save a full timestamped copy; patch: save only changed cells to <base>.patch.json")
+    parser.add_argument('--autosave', type=float, metavar='SECONDS', default=None,
+                        help="Save the patch in the background this long after an edit (implies --save-mode patch)")
     parser.add_argument('--test', action='store_true', help="Run tests")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.test:
         sys.exit(pytest.main([__file__]))
@@ -342,7 +846,8 @@ def main():
         print(f"{Fore.RED}Error: filename argument is required unless --test is specified.")
         sys.exit(1)
 
-    app = TouchUp(args.filename, hero_column=args.hero)
+    app = TouchUp(args.filename, hero_column=args.hero, lazy=args.lazy,
+                  save_mode=args.save_mode, autosave=args.autosave)
     app.interactive_loop()
 
 
@@ -392,6 +897,44 @@ def test_next_prev_row(app, capsys):
     app.prev_row()
     assert app.current_row == start_row
 
+class FakeTerminal(io.StringIO):
+    def isatty(self):
+        return True
+
+def test_display_row_redraws_only_changed_lines(tmp_path):
+    path = tmp_path / "groups.csv"
+    path.write_text("Name,Group\nAlice,staff\nBob,staff\n")
+    app = TouchUp(str(path))
+    app.screen.out = FakeTerminal()
+    app.display_row()
+    assert "Group: staff" in app.screen.out.getvalue()
+    app.screen.out = FakeTerminal()
+    app.next_row()
+    redraw = app.screen.out.getvalue()
+    assert "Name: Bob" in redraw and "Row 2/2" in redraw
+    assert "Group: staff" not in redraw
+
+def test_output_below_frame_forces_full_repaint(monkeypatch, tmp_path):
+    path = tmp_path / "groups.csv"
+    path.write_text("Name,Group\nAlice,staff\nBob,staff\n")
+    app = TouchUp(str(path))
+    app.screen.out = FakeTerminal()
+    commands = iter(["facet Group", "n", "q"])
+    def fake_input(prompt):
+        command = next(commands)
+        if command == "n":
+            app.screen.out = FakeTerminal()
+        return command
+    monkeypatch.setattr('builtins.input', fake_input)
+    with pytest.raises(SystemExit):
+        app.interactive_loop()
+    # The facet listing may have scrolled the frame, so Bob's row is a full repaint
+    assert app.screen.out.getvalue().startswith(CLEAR)
+    assert "Group: staff" in app.screen.out.getvalue()
+
+def test_parse_keys_collapses_arrows():
+    assert parse_keys("nn\x1b[B\x1b[Ak\x1b") == ['n', 'n', 'down', 'up', 'k', 'esc']
+
 def test_edit_row_with_args(app, capsys):
     app.edit_row("Age", "40")
     out = capsys.readouterr().out
@@ -428,6 +971,54 @@ def test_undo_redo(app, capsys):
     assert "Redo successful." in out
     assert app.df.at[app.current_row, "Age"] == "50"
 
+def test_undo_compound_entry(monkeypatch, app, capsys):
+    monkeypatch.setattr(sys.modules[__name__], 'reparse_row', lambda row: {"City": "York", "Age": 31})
+    monkeypatch.setattr('builtins.input', lambda prompt: "y")
+    app.edit_row("Name", "Alicia")
+    app.reparse()
+    app.next_row()
+    app.undo()
+    assert app.current_row == 0
+    assert app.df.at[0, "City"] == "NY" and app.df.at[0, "Age"] == 30
+    assert app.df.at[0, "Name"] == "Alicia"
+    app.undo()
+    assert app.df.at[0, "Name"] == "Alice"
+    app.redo()
+    app.redo()
+    assert app.df.at[0, "City"] == "York" and app.df.at[0, "Age"] == 31
+    assert len(app.undo_stack) == 2 and not app.redo_stack
+
+def test_bulk_edit_replace_with_filter(monkeypatch, tmp_path, capsys):
+    path = tmp_path / "jobs.csv"
+    path.write_text("occupation,court\njet worker Whitby,Whitby\njet worker Whitby,York\nlabourer,Whitby\njet worker Whitby,Whitby\n")
+    app = TouchUp(str(path))
+    answers = iter(["regex", r" Whitby$", "", "court == 'Whitby'", "y"])
+    monkeypatch.setattr('builtins.input', lambda prompt: next(answers))
+    app.bulk_edit("occupation")
+    assert "2 cells in 'occupation' will change" in capsys.readouterr().out
+    assert app.df["occupation"].tolist() == ["jet worker", "jet worker Whitby", "labourer", "jet worker"]
+    assert len(app.undo_stack) == 1
+    app.undo()
+    assert app.df["occupation"].tolist() == ["jet worker Whitby"] * 2 + ["labourer", "jet worker Whitby"]
+    assert app.search_index.search("occupation", "=jet worker") == []
+
+def test_bulk_edit_filter_with_missing_values(monkeypatch, tmp_path):
+    path = tmp_path / "offences.csv"
+    path.write_text("offence,court\ndrunk and disorderly,Whitby\n,Whitby\ntheft,York\n")
+    app = TouchUp(str(path))
+    answers = iter(["set", "Scarborough", "offence.str.contains('drunk')", "y"])
+    monkeypatch.setattr('builtins.input', lambda prompt: next(answers))
+    app.bulk_edit("court")
+    assert app.df["court"].tolist() == ["Scarborough", "Whitby", "York"]
+
+def test_bulk_edit_set_cancelled(monkeypatch, app, capsys):
+    answers = iter(["set", "Leeds", "Age > 28", "n"])
+    monkeypatch.setattr('builtins.input', lambda prompt: next(answers))
+    app.bulk_edit("City")
+    assert "2 cells in 'City' will change" in capsys.readouterr().out
+    assert app.df["City"].tolist() == ["NY", "LA", "Chicago"]
+    assert not app.undo_stack
+
 def test_go_to(app, capsys):
     app.go_to("2")
     assert app.current_row == 1
@@ -451,6 +1042,95 @@ def test_find_prompt(monkeypatch, app, capsys):
     out = capsys.readouterr().out
     assert "Found 'LA' in column 'City'" in out
 
+def test_find_next_prev_and_all(tmp_path, capsys):
+    path = tmp_path / "cities.csv"
+    path.write_text("Name,City\nA,York\nB,Leeds\nC,New York\nD,York\n")
+    app = TouchUp(str(path))
+    app.find("City", "York")
+    assert app.current_row == 0
+    app.find_next()
+    assert app.current_row == 2
+    app.find_next()
+    assert app.current_row == 3
+    app.find_next()
+    assert app.current_row == 0
+    app.find_prev()
+    assert app.current_row == 3
+    app.find_all("City", "=York")
+    assert "2 matches for '=York'" in capsys.readouterr().out
+    assert app.search_index.search("City", "=York") == [0, 3]
+    assert app.search_index.search("City", "/^(New )?York$/") == [0, 2, 3]
+
+def test_find_index_updated_on_edit(app, capsys):
+    assert app.search_index.search("City", "Chicago") == [2]
+    app.edit_row("City", "Chicago Heights")
+    assert app.search_index.search("City", "Chicago") == [0, 2]
+    app.undo()
+    assert app.search_index.search("City", "=Chicago") == [2]
+    app.find_all("City", "Chicago")
+    assert "1 matches for 'Chicago'" in capsys.readouterr().out
+
+def test_find_invalid_regex(app, capsys):
+    app.find("City", "/(/")
+    assert "Invalid regular expression" in capsys.readouterr().out
+
+def test_facet_counts_update_and_jump(tmp_path, capsys):
+    path = tmp_path / "residences.csv"
+    path.write_text("Name,residence\nA,Whitby\nB,Whitby\nC,\nD,Sleights\nE,Whitby\n")
+    app = TouchUp(str(path))
+    app.facet("residence", "2")
+    out = capsys.readouterr().out
+    assert "2 distinct values, 1 empty" in out
+    assert "[1] Whitby (3)" in out and "[3] Sleights (1)" in out
+    app.go_to("3")
+    app.edit_row("residence", "Ruswarp")
+    facets = app.facets["residence"]
+    assert facets.nulls == 0 and facets.counts["Ruswarp"] == 1
+    app.undo()
+    assert facets.nulls == 1 and "Ruswarp" not in facets.counts
+    app.facet_jump("1")
+    assert app.current_row == 4
+    app.find_next()
+    assert app.current_row == 0
+
+def test_sort_and_filter_views(tmp_path, capsys):
+    path = tmp_path / "people.csv"
+    path.write_text("surname,year,court\nSmith,1888,Whitby\nAdams,1890,York\nJones,1885,Whitby\nBrown,1889,Whitby\n")
+    app = TouchUp(str(path))
+    app.sort_view("surname")
+    assert app.current_row == 0 and app.view_pos == 3
+    app.next_row()
+    assert app.current_row == 1
+    app.filter_view("court", "==", "'Whitby'")
+    assert app.view.tolist() == [3, 2, 0]
+    app.sort_view("year", "desc")
+    assert app.view.tolist() == [3, 0, 2]
+    app.go_to("2")
+    assert app.current_row == 0
+    app.edit_row("surname", "Smyth")
+    assert app.df.at[0, "surname"] == "Smyth"
+    assert app.df["surname"].tolist() == ["Smyth", "Adams", "Jones", "Brown"]
+    assert ("court == 'Whitby'", ("year", True)) in app.views.arrays
+    assert (None, ("surname", False)) not in app.views.arrays
+    app.switch_view("off")
+    app.next_row()
+    assert app.current_row == 1
+    assert "Row 2/4" in capsys.readouterr().out
+
+def test_sort_categorical_by_value(tmp_path, sample_csv):
+    (tmp_path / "test.schema.json").write_text('{"columns": {"City": "category"}}')
+    app = TouchUp(str(sample_csv))
+    app.edit_row("City", "Aislaby")
+    app.sort_view("City")
+    assert app.df["City"].iloc[app.view].tolist() == ["Aislaby", "Chicago", "LA"]
+
+def test_filter_view_with_missing_values(tmp_path):
+    path = tmp_path / "offences.csv"
+    path.write_text("offence,court\ndrunk and disorderly,Whitby\n,Whitby\ntheft,York\ndrunk,York\n")
+    app = TouchUp(str(path))
+    app.filter_view("offence.str.contains('drunk')")
+    assert app.view.tolist() == [0, 3]
+
 def test_parse_command_valid(app, capsys):
     app.parse_command("next")
     out = capsys.readouterr().out
@@ -467,6 +1147,28 @@ def test_interactive_loop_quit(monkeypatch, app, capsys):
     with pytest.raises(SystemExit):
         app.interactive_loop()
 
+def test_patch_save_reload_and_consolidate(sample_csv):
+    app = TouchUp(str(sample_csv), save_mode='patch')
+    app.edit_row("City", "York")
+    app.save_csv()
+    patch = json.loads(open(app.patch_path()).read())
+    assert patch['cells'] == [[0, "City", "York"]]
+    reopened = TouchUp(str(sample_csv), save_mode='patch')
+    assert reopened.df.at[0, "City"] == "York"
+    reopened.consolidate()
+    assert not os.path.exists(reopened.patch_path())
+    assert pd.read_csv(sample_csv).at[0, "City"] == "York"
+
+def test_autosave_coalesces_edits(sample_csv):
+    app = TouchUp(str(sample_csv), autosave=0.05)
+    app.edit_row("City", "York")
+    app.edit_row("Name", "Alicia")
+    deadline = time.time() + 2
+    while app.modified and time.time() < deadline:
+        time.sleep(0.01)
+    patch = json.loads(open(app.patch_path()).read())
+    assert sorted(patch['cells']) == [[0, "City", "York"], [0, "Name", "Alicia"]]
+
 def test_save_csv_creates_file(tmp_path, app):
     app.modified = True
     app.save_csv()
@@ -474,5 +1176,73 @@ def test_save_csv_creates_file(tmp_path, app):
     # Might not save in tmp_path, so just check file exists near original
     assert any(f.name.startswith("test_") and f.suffix == ".csv" for f in files) or True
 
+def test_reparse_applies_changes(monkeypatch, app, capsys):
+    monkeypatch.setattr(sys.modules[__name__], 'reparse_row', lambda row: {"City": "York"})
+    monkeypatch.setattr('builtins.input', lambda prompt: "y")
+    app.parse_command("reparse")
+    assert app.df.at[app.current_row, "City"] == "York"
+    assert "Updated 1 fields" in capsys.readouterr().out
+
+def test_reparse_service_unavailable(monkeypatch, app, capsys):
+    def unavailable(row):
+        raise ParserServiceError("parser service not running")
+    monkeypatch.setattr(sys.modules[__name__], 'reparse_row', unavailable)
+    app.parse_command("reparse")
+    assert "parser service not running" in capsys.readouterr().out
+
+def test_load_csv_with_schema_categorical(tmp_path, sample_csv):
+    (tmp_path / "test.schema.json").write_text('{"columns": {"City": "category"}}')
+    app = TouchUp(str(sample_csv))
+    assert isinstance(app.df["City"].dtype, pd.CategoricalDtype)
+    app.edit_row("City", "York")
+    assert app.df.at[app.current_row, "City"] == "York"
+    assert "York" in app.df["City"].cat.categories
+    app.save_csv()
+    saved = next(f for f in tmp_path.glob("test_*.csv"))
+    assert (tmp_path / f"{saved.stem}.schema.json").exists()
+    assert isinstance(TouchUp(str(saved)).df["City"].dtype, pd.CategoricalDtype)
+    patched = TouchUp(str(sample_csv), save_mode='patch')
+    patched.edit_row("City", "Leeds")
+    patched.consolidate()
+    assert isinstance(TouchUp(str(sample_csv)).df["City"].dtype, pd.CategoricalDtype)
+
+def test_edit_nullable_integer_column(monkeypatch, tmp_path, capsys):
+    path = tmp_path / "dates.csv"
+    path.write_text("offence,year\ndrunk,1888\ntheft,\n")
+    (tmp_path / "dates.schema.json").write_text('{"columns": {"year": "Int64"}}')
+    app = TouchUp(str(path))
+    assert str(app.df["year"].dtype) == "Int64"
+    app.parse_command("e year 1890")
+    assert app.df.at[0, "year"] == 1890
+    app.parse_command("e year abc")
+    assert "'abc' is not a whole number" in capsys.readouterr().out
+    assert app.df.at[0, "year"] == 1890 and len(app.undo_stack) == 1
+    app.undo()
+    assert app.df.at[0, "year"] == 1888
+    answers = iter(["set", "1900", "", "y"])
+    monkeypatch.setattr('builtins.input', lambda prompt: next(answers))
+    app.bulk_edit("year")
+    assert app.df["year"].tolist() == [1900, 1900]
+    assert str(app.df["year"].dtype) == "Int64"
+
+def test_lazy_load_edit_and_save(tmp_path):
+    path = tmp_path / "lazy.csv"
+    path.write_text('Name,Notes\nAlice,"two\nlines"\nBob,plain\nCharlie,"say ""hi"""\n')
+    app = TouchUp(str(path), lazy=True)
+    assert app.total_rows == 3
+    assert app.df.iloc[0]["Notes"] == "two\nlines"
+    assert app.df.iloc[2]["Notes"] == 'say "hi"'
+    app.edit_row("Name", "Bobby")
+    app.next_row()
+    app.edit_row("Name", "Robert")
+    assert app.df.at[1, "Name"] == "Robert"
+    app.undo()
+    assert app.df.at[1, "Name"] == "Bob"
+    app.save_csv()
+    saved = [f for f in tmp_path.iterdir() if f.name.startswith("lazy_") and f.suffix == ".csv"]
+    reread = pd.read_csv(saved[0])
+    assert reread["Name"].tolist() == ["Bobby", "Bob", "Charlie"]
+    assert reread["Notes"].tolist() == ["two\nlines", "plain", 'say "hi"']
+
 if __name__ == "__main__":
     main()
\ No newline at end of file